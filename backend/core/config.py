@@ -10,6 +10,10 @@ class Settings(BaseSettings):
     DATABASE_URL: Annotated[str, Field(description="Database connection URL", validate_default=True)] = Field(default="")
     ALLOWED_ORIGINS: Union[str, List[str]] = Field(default="")
     GEMINI_API_KEY: Annotated[str, Field(description="Gemini API Key", validate_default=True)] = Field(default="")
+    # Shared Gemini client limits (per worker process)
+    GEMINI_REQUESTS_PER_MINUTE: int = Field(default=60)
+    GEMINI_BURST: int = Field(default=10)
+    GEMINI_MAX_CONCURRENT: int = Field(default=8)
     BACKEND_URL: str = Field(default="http://localhost:8000")
     FRONTEND_URL: str = Field(default="http://localhost:5174")
     
@@ -21,11 +25,60 @@ class Settings(BaseSettings):
     GMAIL_CREDENTIALS_PATH: str = Field(default="/etc/secrets/credentials.json")
     GMAIL_TOKEN_PATH: str = Field(default="/etc/secrets/token.json")
     FROM_EMAIL: str = Field(default="RushiGo Notifications")
+    EMAIL_MAX_WORKERS: int = Field(default=8)  # Parallel Gmail clients for bulk sends
+    EMAIL_SEND_RATE_PER_SECOND: float = Field(default=10.0)  # Gmail quota pacing
+    EMAIL_OUTBOX_POLL_SECONDS: int = Field(default=15)
+    EMAIL_OUTBOX_BATCH_SIZE: int = Field(default=100)
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = Field(default=6)  # Then the message is dead-lettered
+    
+    # Background job leader leases (one process runs each job across workers/instances)
+    SCHEDULER_LEASE_TTL_SECONDS: int = Field(default=180)  # Takeover delay if the holder dies
+    
+    # Background job queue
+    JOB_WORKER_IN_PROCESS: bool = Field(default=True)  # Disable when running `python -m services.worker` separately
+    JOB_WORKER_CONCURRENCY: int = Field(default=4)
+    JOB_POLL_SECONDS: float = Field(default=2.0)
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = Field(default=300)  # Claimed jobs are retried after this
+    JOB_MAX_ATTEMPTS: int = Field(default=5)
+    SCAN_JOB_STALE_SECONDS: int = Field(default=1800)  # Unfinished background scans older than this are failed
+    
+    # Deadline delta sync
+    DEADLINE_TOMBSTONE_RETENTION_DAYS: int = Field(default=30)  # Older sync tokens get a full reset
+    
+    # Gemini extraction result cache
+    EXTRACTION_CACHE_TTL_SECONDS: int = Field(default=7 * 24 * 3600)
+    EXTRACTION_CACHE_MEMORY_ENTRIES: int = Field(default=512)  # In-process LRU in front of Postgres
+    EXTRACTION_CACHE_MAX_ROWS: int = Field(default=50000)  # Least recently used rows beyond this are evicted
+    
+    # Chunked document extraction (large documents fan out to parallel Gemini calls)
+    EXTRACTION_CHUNK_CHARS: int = Field(default=12000)
+    EXTRACTION_CHUNK_OVERLAP_CHARS: int = Field(default=800)
+    EXTRACTION_MAX_CONCURRENT_CHUNKS: int = Field(default=4)  # Per document
+    
+    # Prompt pre-filter: keep lines near dates/deadline words, within a token budget per scan
+    EXTRACTION_TOKEN_BUDGET: int = Field(default=60000)  # Estimated with tiktoken
+    EXTRACTION_PREFILTER_MIN_TOKENS: int = Field(default=1500)  # Shorter inputs are sent whole
+    EXTRACTION_PREFILTER_CONTEXT_LINES: int = Field(default=2)  # Kept around each relevant line
+    
+    # Document uploads are copied in chunks, to disk past the memory threshold
+    UPLOAD_MAX_BYTES: int = Field(default=25 * 1024 * 1024)
+    UPLOAD_SPOOL_MEMORY_BYTES: int = Field(default=1024 * 1024)
+    UPLOAD_CHUNK_BYTES: int = Field(default=256 * 1024)
+    SCAN_UPLOAD_DIR: str = Field(default="")  # Staged background-scan uploads; must be shared with separate workers (default: system temp dir)
+    
+    # PDF text extraction (process pool over page ranges)
+    PDF_EXTRACT_WORKERS: int = Field(default=2)
+    PDF_PAGES_PER_TASK: int = Field(default=16)
+    PDF_MAX_PAGES: int = Field(default=500)
+    PDF_MAX_BYTES: int = Field(default=50 * 1024 * 1024)
+    DOCX_MAX_TEXT_CHARS: int = Field(default=2_000_000)  # Guards against zip bombs
     
     # Google Calendar OAuth
     GOOGLE_CLIENT_ID: str = Field(default="")
     GOOGLE_CLIENT_SECRET: str = Field(default="")
     CALENDAR_CREDENTIALS_JSON: str = Field(default="")
+    GOOGLE_API_MAX_WORKERS: int = Field(default=16)  # Thread pool for blocking Google client calls
+    GOOGLE_API_TIMEOUT_SECONDS: float = Field(default=20.0)
 
     @field_validator("DATABASE_URL", "GEMINI_API_KEY")
     def validate_required_fields(cls, value: str) -> str:
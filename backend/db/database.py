@@ -1,5 +1,9 @@
+from typing import Any, AsyncIterator, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 from core.config import settings
@@ -14,6 +18,48 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(url: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Translate DATABASE_URL into an async driver URL plus connect_args
+
+    postgresql:// uses asyncpg, which takes `ssl` instead of libpq's `sslmode`;
+    sqlite:// uses aiosqlite for local development.
+    """
+    connect_args: Dict[str, Any] = {}
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):], connect_args
+    parts = urlsplit(url)
+    scheme = parts.scheme
+    if scheme in ("postgres", "postgresql", "postgresql+psycopg2"):
+        scheme = "postgresql+asyncpg"
+        query = []
+        for key, value in parse_qsl(parts.query):
+            if key == "sslmode":
+                connect_args["ssl"] = value
+            elif key == "connect_timeout":
+                connect_args["timeout"] = float(value)
+            elif key == "application_name":
+                connect_args["server_settings"] = {"application_name": value}
+            else:
+                query.append((key, value))
+        parts = parts._replace(scheme=scheme, query=urlencode(query))
+    return urlunsplit(parts), connect_args
+
+
+# Async engine for the request path; the sync engine above stays for the scheduler, workers and scripts
+_async_url, _async_connect_args = async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=settings.DEBUG
+)
+
+# expire_on_commit=False: attributes stay readable after commit without implicit (sync) reloads
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -23,6 +69,10 @@ def get_db():
     finally:
         db.close() 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
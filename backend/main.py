@@ -74,6 +74,16 @@ try:
             conn.commit()
             logger.info("Added calendar_token_expiry column to users table")
         
+        if 'timezone' not in user_columns:
+            conn.execute(text("ALTER TABLE users ADD COLUMN timezone VARCHAR(64) NOT NULL DEFAULT 'UTC'"))
+            conn.commit()
+            logger.info("Added timezone column to users table")
+        
+        if 'digest_hour' not in user_columns:
+            conn.execute(text("ALTER TABLE users ADD COLUMN digest_hour INTEGER NOT NULL DEFAULT 8"))
+            conn.commit()
+            logger.info("Added digest_hour column to users table")
+        
         # Check and add Deadline table columns
         deadline_columns = [col['name'] for col in inspector.get_columns('deadlines')]
         
@@ -86,8 +96,189 @@ try:
             conn.execute(text("ALTER TABLE deadlines ADD COLUMN calendar_synced BOOLEAN DEFAULT FALSE"))
             conn.commit()
             logger.info("Added calendar_synced column to deadlines table")
-    
+
     logger.info("Calendar migration completed successfully")
+
+    # Notification delivery ledger columns (dedup by deadline/kind instead of message text)
+    with engine.connect() as conn:
+        inspector = inspect(engine)
+        notification_columns = [col['name'] for col in inspector.get_columns('notifications')]
+
+        ledger_columns = {
+            'deadline_id': "INTEGER REFERENCES deadlines(id) ON DELETE CASCADE",
+            'kind': "VARCHAR(20)",
+            'channel': "VARCHAR(20) DEFAULT 'email'",
+            'period_key': "VARCHAR(20)",
+            'sent_at': "TIMESTAMP WITH TIME ZONE",
+        }
+        needs_backfill = 'kind' not in notification_columns
+        for column_name, column_type in ledger_columns.items():
+            if column_name not in notification_columns:
+                conn.execute(text(f"ALTER TABLE notifications ADD COLUMN {column_name} {column_type}"))
+                conn.commit()
+                logger.info(f"Added {column_name} column to notifications table")
+
+        if needs_backfill:
+            # Map legacy free-text ledger rows onto (deadline_id, kind) so nothing is re-sent
+            legacy_messages = {
+                'overdue': "'Overdue deadline notification sent for: ' || d.title",
+                '3_days': "'Approaching deadline notification sent for: ' || d.title || ' (3_days)'",
+                '1_day': "'Approaching deadline notification sent for: ' || d.title || ' (1_day)'",
+                '1_hour': "'Approaching deadline notification sent for: ' || d.title || ' (1_hour)'",
+            }
+            for kind, message_expr in legacy_messages.items():
+                conn.execute(text(f"""
+                    INSERT INTO notifications (user_id, deadline_id, kind, channel, message, sent, sent_at, created_at)
+                    SELECT d.user_id, d.id, '{kind}', 'email', MIN(n.message), TRUE, MIN(n.created_at), MIN(n.created_at)
+                    FROM notifications n
+                    JOIN deadlines d ON d.user_id = n.user_id AND n.message = {message_expr}
+                    WHERE n.kind IS NULL AND n.sent = TRUE
+                    GROUP BY d.user_id, d.id
+                """))
+            conn.commit()
+            logger.info("Backfilled notification ledger from legacy messages")
+
+        # Legacy digest rows ("Daily digest sent for YYYY-MM-DD") become one ledger row per user and day.
+        # Runs on every start (it is idempotent) so databases migrated before this mapping catch up too.
+        result = conn.execute(text("""
+            INSERT INTO notifications (user_id, kind, channel, period_key, message, sent, sent_at, created_at)
+            SELECT n.user_id, 'digest', 'email', SUBSTR(n.message, 23, 10), MIN(n.message), TRUE,
+                   MIN(n.created_at), MIN(n.created_at)
+            FROM notifications n
+            WHERE n.kind IS NULL AND n.sent = TRUE AND n.message LIKE 'Daily digest sent for %'
+              AND NOT EXISTS (
+                  SELECT 1 FROM notifications l
+                  WHERE l.user_id = n.user_id AND l.kind = 'digest' AND l.channel = 'email'
+                    AND l.period_key = SUBSTR(n.message, 23, 10)
+              )
+            GROUP BY n.user_id, SUBSTR(n.message, 23, 10)
+        """))
+        conn.commit()
+        if result.rowcount:
+            logger.info(f"Backfilled {result.rowcount} digest ledger rows from legacy messages")
+
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_deadline_kind_channel "
+            "ON notifications (deadline_id, kind, channel) WHERE deadline_id IS NOT NULL"
+        ))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_user_period "
+            "ON notifications (user_id, kind, channel, period_key) WHERE period_key IS NOT NULL"
+        ))
+        conn.commit()
+
+    logger.info("Notification ledger migration completed successfully")
+
+    # Reminder pointer on deadlines so the scheduler only touches due rows
+    with engine.connect() as conn:
+        inspector = inspect(engine)
+        deadline_columns = [col['name'] for col in inspector.get_columns('deadlines')]
+        needs_backfill = 'next_reminder_at' not in deadline_columns
+
+        if 'next_reminder_at' not in deadline_columns:
+            conn.execute(text("ALTER TABLE deadlines ADD COLUMN next_reminder_at TIMESTAMP WITH TIME ZONE"))
+            conn.commit()
+            logger.info("Added next_reminder_at column to deadlines table")
+
+        if 'next_reminder_kind' not in deadline_columns:
+            conn.execute(text("ALTER TABLE deadlines ADD COLUMN next_reminder_kind VARCHAR(20)"))
+            conn.commit()
+            logger.info("Added next_reminder_kind column to deadlines table")
+
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_deadlines_next_reminder_at ON deadlines (next_reminder_at) "
+            "WHERE completed = false AND next_reminder_at IS NOT NULL"
+        ))
+        conn.commit()
+
+    if needs_backfill:
+        from datetime import datetime, timezone
+        from db.database import SessionLocal
+        from services.reminder_schedule import schedule_next_reminder
+
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            pending = db.query(Deadline).filter(
+                Deadline.completed.is_(False),
+                Deadline.date > now
+            ).yield_per(500)
+            for pending_deadline in pending:
+                schedule_next_reminder(pending_deadline, now=now)
+            db.commit()
+            logger.info("Backfilled reminder pointers for upcoming deadlines")
+        finally:
+            db.close()
+
+    # Composite index behind the paginated deadline listing
+    with engine.connect() as conn:
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_deadlines_user_completed_date "
+            "ON deadlines (user_id, completed, date)"
+        ))
+        conn.commit()
+
+    # Delta sync: every deadline carries updated_at, indexed per user
+    with engine.connect() as conn:
+        if settings.is_postgresql:
+            # Existing tables were created without a default, so inserts left updated_at NULL
+            conn.execute(text("ALTER TABLE deadlines ALTER COLUMN updated_at SET DEFAULT now()"))
+        conn.execute(text("UPDATE deadlines SET updated_at = created_at WHERE updated_at IS NULL"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_deadlines_user_updated_at "
+            "ON deadlines (user_id, updated_at)"
+        ))
+        conn.commit()
+
+    # Deadline collection versions behind the list ETags
+    with engine.connect() as conn:
+        inspector = inspect(engine)
+        for table_name in ('users', 'teams'):
+            columns = [col['name'] for col in inspector.get_columns(table_name)]
+            if 'deadlines_version' not in columns:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN deadlines_version INTEGER NOT NULL DEFAULT 0"))
+                conn.commit()
+                logger.info(f"Added deadlines_version column to {table_name} table")
+
+    # Background scan job progress on temp_scans
+    with engine.connect() as conn:
+        inspector = inspect(engine)
+        scan_columns = [col['name'] for col in inspector.get_columns('temp_scans')]
+        progress_columns = {
+            'status': "VARCHAR(20) NOT NULL DEFAULT 'done'",
+            'chunks_done': "INTEGER NOT NULL DEFAULT 0",
+            'chunks_total': "INTEGER NOT NULL DEFAULT 0",
+            'error': "TEXT",
+            'upload_path': "VARCHAR(1024)",
+            'locked_until': "TIMESTAMP WITH TIME ZONE",
+            'upload_content_type': "VARCHAR(255)",
+            'upload_filename': "VARCHAR(255)",
+        }
+        for column_name, column_type in progress_columns.items():
+            if column_name not in scan_columns:
+                conn.execute(text(f"ALTER TABLE temp_scans ADD COLUMN {column_name} {column_type}"))
+                conn.commit()
+                logger.info(f"Added {column_name} column to temp_scans table")
+        if 'upload' in scan_columns:
+            # Uploads used to be stored inline; they are staged on disk now
+            conn.execute(text("ALTER TABLE temp_scans DROP COLUMN upload"))
+            conn.commit()
+            logger.info("Dropped upload column from temp_scans table")
+
+    # Leader lease columns on scheduler_state (one process runs each background job)
+    with engine.connect() as conn:
+        inspector = inspect(engine)
+        state_columns = [col['name'] for col in inspector.get_columns('scheduler_state')]
+
+        if 'lease_owner' not in state_columns:
+            conn.execute(text("ALTER TABLE scheduler_state ADD COLUMN lease_owner VARCHAR(255)"))
+            conn.commit()
+            logger.info("Added lease_owner column to scheduler_state table")
+
+        if 'lease_expires_at' not in state_columns:
+            conn.execute(text("ALTER TABLE scheduler_state ADD COLUMN lease_expires_at TIMESTAMP WITH TIME ZONE"))
+            conn.commit()
+            logger.info("Added lease_expires_at column to scheduler_state table")
     
 except Exception as e:
     logger.error(f"Error ensuring database tables: {str(e)}")
@@ -136,12 +327,29 @@ async def api_health_check():
         "version": "1.0.0"
     }
 
+@app.get(f"{settings.API_PREFIX}/metrics")
+async def metrics():
+    """In-process counters for this worker (cache hit rates, ...)"""
+    from services.extraction_cache import get_extraction_cache
+    from services.gemini_client import get_gemini_client
+    return {
+        "extraction_cache": get_extraction_cache().stats(),
+        "gemini": get_gemini_client().stats()
+    }
+
 @app.on_event("startup")
 async def startup_event():
     """Start background services when the app starts"""
     notification_scheduler.start()
     start_cleanup_scheduler()
     logger.info("Background notification scheduler started")
+    if settings.JOB_WORKER_IN_PROCESS:
+        import asyncio
+        from services.job_queue import set_async_loop
+        from services.worker import start_in_process_worker
+        # Async job handlers (scans) share this loop, its DB pool and the Gemini client
+        set_async_loop(asyncio.get_running_loop())
+        start_in_process_worker()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -150,4 +358,15 @@ async def shutdown_event():
 
     notification_scheduler.stop()
     stop_cleanup_scheduler()
+    if settings.JOB_WORKER_IN_PROCESS:
+        import asyncio
+        from services.worker import stop_in_process_worker
+        # Off the loop: in-flight scan jobs still need it to finish
+        await asyncio.get_running_loop().run_in_executor(None, stop_in_process_worker)
     logger.info("Background schedulers stopped")
+
+    from services.pdf_extraction import shutdown_pdf_pool
+    shutdown_pdf_pool()
+
+    from db.database import async_engine
+    await async_engine.dispose()
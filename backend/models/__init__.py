@@ -3,4 +3,12 @@ from models.deadline import Deadline
 from models.team import Team
 from models.membership import Membership
 from models.notifications import Notification
-from models.temp_scan import TempScan
\ No newline at end of file
+from models.temp_scan import TempScan
+from models.scheduler_state import SchedulerState
+from models.email_outbox import EmailOutbox
+from models.job import Job
+from models.deadline_tombstone import DeadlineTombstone
+from models.extraction_cache import ExtractionCacheEntry
+
+# Registers the flush hook that versions deadline collections
+import services.collection_version  # noqa: E402,F401
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -20,9 +20,27 @@ class Deadline(Base):
     # Google Calendar integration
     calendar_event_id = Column(String(255), nullable=True, index=True)  # Google Calendar event ID
     calendar_synced = Column(Boolean, nullable=False, default=False)  # Whether synced with calendar
-    
+
+    # Reminder pointer maintained by services.reminder_schedule
+    next_reminder_at = Column(DateTime(timezone=True), nullable=True)
+    next_reminder_kind = Column(String(20), nullable=True)  # 3_days, 1_day, 1_hour
+
     user = relationship("User", back_populates="deadlines")
     team = relationship("Team", back_populates="deadlines")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Partial index: the scheduler only ever scans incomplete rows with a pending reminder
+        Index(
+            "ix_deadlines_next_reminder_at",
+            "next_reminder_at",
+            postgresql_where=text("completed = false AND next_reminder_at IS NOT NULL"),
+            sqlite_where=text("completed = 0 AND next_reminder_at IS NOT NULL"),
+        ),
+        # Backs the keyset-paginated listing: filter by owner/completion, walk in date order
+        Index("ix_deadlines_user_completed_date", "user_id", "completed", "date"),
+        # Backs the delta-sync feed (GET /deadlines/changes)
+        Index("ix_deadlines_user_updated_at", "user_id", "updated_at"),
+    )
 
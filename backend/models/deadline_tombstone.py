@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+class DeadlineTombstone(Base):
+    """Record of a deleted deadline so delta-sync clients can drop it"""
+    __tablename__ = "deadline_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    deadline_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_deadline_tombstones_user_deleted_at", "user_id", "deleted_at"),
+    )
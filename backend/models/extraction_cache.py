@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+
+class ExtractionCacheEntry(Base):
+    """Gemini deadline extraction result, keyed by a hash of its inputs"""
+    __tablename__ = "extraction_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of prompt version, model and normalized text
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(50), nullable=False)
+    result_json = Column(Text, nullable=False)  # JSON array of extracted deadlines
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_extraction_cache_expires_at", "expires_at"),
+        Index("ix_extraction_cache_last_used_at", "last_used_at"),
+    )
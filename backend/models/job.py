@@ -0,0 +1,42 @@
+from enum import Enum
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, text
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"  # Gave up after max_attempts
+
+
+class Job(Base):
+    """Background work claimed by workers with FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(100), nullable=False)  # Handler name, e.g. "calendar.create_event"
+    payload = Column(Text, nullable=False, default="{}")  # JSON string
+    dedupe_key = Column(String(255), unique=True, nullable=True)
+    status = Column(String(20), nullable=False, default=JobStatus.queued.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Visibility timeout while running
+    locked_by = Column(String(255), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON string returned by the handler
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_jobs_due",
+            "run_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+            sqlite_where=text("status IN ('queued', 'running')"),
+        ),
+    )
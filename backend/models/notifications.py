@@ -1,15 +1,58 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from enum import Enum
+
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from db.database import Base
 from datetime import datetime, timezone
 
+
+class NotificationKind(str, Enum):
+    three_days = "3_days"
+    one_day = "1_day"
+    one_hour = "1_hour"
+    overdue = "overdue"
+    digest = "digest"
+
+
+class NotificationChannel(str, Enum):
+    email = "email"
+
+
 class Notification(Base):
+    """
+    Delivery ledger: one row per notification that went out.
+
+    Deadline reminders are unique per (deadline_id, kind, channel); digests are
+    unique per (user_id, kind, channel, period_key) where period_key is the day.
+    """
     __tablename__ = "notifications"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    deadline_id = Column(Integer, ForeignKey("deadlines.id", ondelete="CASCADE"), nullable=True)
+    kind = Column(String(20), nullable=True)  # NotificationKind value
+    channel = Column(String(20), nullable=True, default=NotificationChannel.email.value)
+    period_key = Column(String(20), nullable=True)  # e.g. "2025-10-15" for daily digests
     message = Column(String(1000))
     sent = Column(Boolean, default=False)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
     user = relationship("User", back_populates="notifications")
+
+    __table_args__ = (
+        Index(
+            "uq_notifications_deadline_kind_channel",
+            "deadline_id", "kind", "channel",
+            unique=True,
+            postgresql_where=text("deadline_id IS NOT NULL"),
+            sqlite_where=text("deadline_id IS NOT NULL"),
+        ),
+        Index(
+            "uq_notifications_user_period",
+            "user_id", "kind", "channel", "period_key",
+            unique=True,
+            postgresql_where=text("period_key IS NOT NULL"),
+            sqlite_where=text("period_key IS NOT NULL"),
+        ),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+
+from db.database import Base
+
+class SchedulerState(Base):
+    """Durable per-job scheduler state: sweep watermarks and the leader lease"""
+    __tablename__ = "scheduler_state"
+
+    name = Column(String(100), primary_key=True)
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    lease_owner = Column(String(255), nullable=True)  # Process currently allowed to run this job
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
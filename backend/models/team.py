@@ -10,6 +10,8 @@ class Team(Base):
     name = Column(String(100), index=True, nullable=False)
     description = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped by services.collection_version on any write to this team's deadlines (ETag source)
+    deadlines_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     members = relationship("Membership", back_populates="team")
     deadlines = relationship("Deadline", back_populates="team")
\ No newline at end of file
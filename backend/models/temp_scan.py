@@ -1,13 +1,34 @@
+from enum import Enum
+
 from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
 from db.database import Base
 
+
+class ScanStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
 class TempScan(Base):
     __tablename__ = "temp_scans"
     
     id = Column(Integer, primary_key=True, index=True)
     temp_id = Column(String, unique=True, index=True, nullable=False)
     user_id = Column(Integer, nullable=False)
-    deadlines_json = Column(Text, nullable=False)  # JSON string of deadlines
+    deadlines_json = Column(Text, nullable=False)  # JSON string of deadlines (partial while running)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    expires_at = Column(DateTime(timezone=True), nullable=False)
\ No newline at end of file
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Background scan job progress; synchronous scans are stored as done
+    status = Column(String(20), nullable=False, default=ScanStatus.done.value, server_default=ScanStatus.done.value)
+    chunks_done = Column(Integer, nullable=False, default=0, server_default="0")
+    chunks_total = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Claim of the job running the scan, renewed while it runs
+    # Uploaded document staged in SCAN_UPLOAD_DIR for its scan.document job; removed once the scan finishes
+    upload_path = Column(String(1024), nullable=True)
+    upload_content_type = Column(String(255), nullable=True)
+    upload_filename = Column(String(255), nullable=True)
@@ -23,6 +23,13 @@ class User(Base):
     calendar_refresh_token = Column(String(512), nullable=True)  # User's refresh token
     calendar_token_expiry = Column(DateTime(timezone=True), nullable=True)  # Token expiration
     
+    # Daily digest delivery preferences
+    timezone = Column(String(64), nullable=False, default="UTC", server_default="UTC")  # IANA name, e.g. "America/New_York"
+    digest_hour = Column(Integer, nullable=False, default=8, server_default="8")  # Local hour (0-23)
+    
+    # Bumped by services.collection_version on any write to this user's deadlines (ETag source)
+    deadlines_version = Column(Integer, nullable=False, default=0, server_default="0")
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
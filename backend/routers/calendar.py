@@ -9,13 +9,16 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 
-from db.database import get_db
+from db.database import get_async_db
 from models import User, Deadline
-from services.calendar_service import get_calendar_service
+from services.google_executor import AsyncCalendarService, run_google_call
+from services.reminder_schedule import schedule_next_reminder
+from services.job_queue import enqueue_job_async
 from routers.user import get_current_user
 from auth.oauth2 import get_current_user_optional, SECRET_KEY, ALGORITHM
 from core.config import settings
@@ -58,7 +61,7 @@ async def initiate_calendar_oauth(
     request: Request,
     token: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Initiate OAuth flow for user to connect their Google Calendar
@@ -78,7 +81,7 @@ async def initiate_calendar_oauth(
                 payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
                 email = payload.get("sub")
                 if email:
-                    current_user = db.query(User).filter(User.email == email).first()
+                    current_user = await db.scalar(select(User).where(User.email == email))
             except JWTError as e:
                 logger.error(f"Invalid token in query param: {e}")
                 raise HTTPException(
@@ -154,7 +157,7 @@ async def calendar_oauth_callback(
     code: Optional[str] = None,
     state: Optional[str] = None,
     error: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     OAuth callback endpoint - Google redirects here after user authorizes
@@ -188,7 +191,7 @@ async def calendar_oauth_callback(
                 status_code=status.HTTP_302_FOUND
             )
         
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         
         if not user:
             logger.error(f"User {user_id} not found in OAuth callback")
@@ -233,7 +236,7 @@ async def calendar_oauth_callback(
         logger.info(f"Exchanging OAuth code for tokens, user_id: {user_id}")
         
         # Exchange authorization code for tokens
-        flow.fetch_token(code=code)
+        await run_google_call(flow.fetch_token, code=code)
         credentials = flow.credentials
         
         # Store tokens in user's account
@@ -242,7 +245,7 @@ async def calendar_oauth_callback(
         setattr(user, 'calendar_token_expiry', credentials.expiry)
         setattr(user, 'calendar_sync_enabled', True)  # Auto-enable sync on connection
         
-        db.commit()
+        await db.commit()
         
         logger.info(f"Calendar connected successfully for user {user_id}")
         
@@ -264,7 +267,7 @@ async def calendar_oauth_callback(
 @router.post("/disconnect")
 async def disconnect_calendar(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Disconnect user's Google Calendar
@@ -277,7 +280,7 @@ async def disconnect_calendar(
         setattr(current_user, 'calendar_token_expiry', None)
         setattr(current_user, 'calendar_sync_enabled', False)
         
-        db.commit()
+        await db.commit()
         
         logger.info(f"Calendar disconnected for user {current_user.id}")
         
@@ -316,7 +319,7 @@ async def get_calendar_status(
 @router.post("/refresh-token")
 async def refresh_calendar_token(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh user's Google Calendar OAuth token if expired
@@ -362,12 +365,12 @@ async def refresh_calendar_token(
         creds = Credentials.from_authorized_user_info(creds_info, SCOPES)
         
         if creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+            await run_google_call(creds.refresh, Request())
             
             # Update user's token in database
             setattr(current_user, 'calendar_token', creds.token)
             setattr(current_user, 'calendar_token_expiry', creds.expiry)
-            db.commit()
+            await db.commit()
             
             logger.info(f"Refreshed calendar token for user {current_user.id}")
             
@@ -395,14 +398,14 @@ async def refresh_calendar_token(
 async def enable_calendar_sync(
     calendar_id: Optional[str] = "primary",
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Enable Google Calendar sync for the user
     
     This will:
     1. Enable calendar sync for future deadlines
-    2. Automatically sync all existing deadlines to Google Calendar
+    2. Queue a background sync of all existing deadlines to Google Calendar
     """
     try:
         # Check if already enabled
@@ -410,9 +413,8 @@ async def enable_calendar_sync(
         
         # Test calendar connection (if using user's OAuth tokens)
         if getattr(current_user, 'calendar_token', None):
-            from services.calendar_service import get_calendar_service_for_user
             try:
-                get_calendar_service_for_user(current_user)
+                await AsyncCalendarService.for_user(current_user, fallback=False)
             except ValueError as e:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -420,63 +422,23 @@ async def enable_calendar_sync(
                 )
         else:
             # Test with global calendar service
-            calendar_service = get_calendar_service()
+            await AsyncCalendarService.shared()
         
         # Update user preferences
         setattr(current_user, 'calendar_sync_enabled', True)
         setattr(current_user, 'calendar_id', calendar_id)
-        db.commit()
-        
-        # If not previously enabled, sync all existing deadlines
-        synced_count = 0
-        errors = []
         
+        # If not previously enabled, sync existing deadlines in the background
+        sync_job = None
         if not was_enabled:
-            logger.info(f"Calendar sync just enabled for user {current_user.id}. Syncing existing deadlines...")
-            
-            try:
-                # Get calendar service for the user
-                from services.calendar_service import get_calendar_service_for_user
-                calendar_service = get_calendar_service_for_user(current_user)
-            except ValueError:
-                # Fall back to global service if user doesn't have OAuth tokens
-                calendar_service = get_calendar_service()
-            
-            # Get all unsynced deadlines for the user
-            unsynced_deadlines = db.query(Deadline).filter(
-                Deadline.user_id == current_user.id,
-                Deadline.calendar_synced == False,
-                Deadline.completed == False
-            ).all()
-            
-            for deadline in unsynced_deadlines:
-                try:
-                    # Create calendar event
-                    event = calendar_service.create_event(
-                        title=str(getattr(deadline, 'title')),
-                        description=str(getattr(deadline, 'description', '') or ''),
-                        start_datetime=getattr(deadline, 'date'),
-                        estimated_hours=getattr(deadline, 'estimated_hours', None),
-                        course=getattr(deadline, 'course', None),
-                        priority=str(getattr(deadline, 'priority')),
-                        calendar_id=str(calendar_id) if calendar_id else "primary"
-                    )
-                    
-                    # Update deadline with calendar event ID
-                    setattr(deadline, 'calendar_event_id', event.get('id'))
-                    setattr(deadline, 'calendar_synced', True)
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to sync deadline {deadline.id}: {e}")
-                    errors.append({
-                        "deadline_id": deadline.id,
-                        "title": deadline.title,
-                        "error": str(e)
-                    })
-            
-            db.commit()
-            logger.info(f"Synced {synced_count} existing deadlines for user {current_user.id}")
+            logger.info(f"Calendar sync just enabled for user {current_user.id}. Queueing sync of existing deadlines...")
+            sync_job = await enqueue_job_async(
+                db,
+                "calendar.sync_user",
+                {"user_id": current_user.id, "calendar_id": calendar_id},
+                dedupe_key=f"calendar.sync_user:{current_user.id}"
+            )
+        await db.commit()
         
         logger.info(f"Enabled calendar sync for user {current_user.id}")
         
@@ -485,12 +447,9 @@ async def enable_calendar_sync(
             "calendar_id": calendar_id,
         }
         
-        # Add sync results if deadlines were synced
         if not was_enabled:
-            response["synced_count"] = synced_count
-            response["message"] += f" and synced {synced_count} existing deadlines"
-            if errors:
-                response["sync_errors"] = errors
+            response["message"] += "; existing deadlines are being synced"
+            response["sync_job_id"] = sync_job.id if sync_job else None
         
         return response
         
@@ -512,7 +471,7 @@ async def enable_calendar_sync(
 @router.post("/disable")
 async def disable_calendar_sync(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Disable Google Calendar sync for the user
@@ -520,7 +479,7 @@ async def disable_calendar_sync(
     Existing synced events will remain in your calendar.
     """
     setattr(current_user, 'calendar_sync_enabled', False)
-    db.commit()
+    await db.commit()
     
     logger.info(f"Disabled calendar sync for user {current_user.id}")
     
@@ -542,15 +501,16 @@ async def get_calendar_sync_status(
     }
 
 
-@router.post("/sync-all")
+@router.post("/sync-all", status_code=status.HTTP_202_ACCEPTED)
 async def sync_all_deadlines(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Sync all existing deadlines to Google Calendar
     
-    This will create calendar events for all deadlines that aren't already synced.
+    Queues a background job that creates calendar events for all deadlines
+    that aren't already synced.
     """
     try:
         if not getattr(current_user, 'calendar_sync_enabled', False):
@@ -559,52 +519,29 @@ async def sync_all_deadlines(
                 detail="Calendar sync is not enabled. Enable it first."
             )
         
-        calendar_service = get_calendar_service()
         calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
         
-        # Get all unsynced deadlines for the user
-        unsynced_deadlines = db.query(Deadline).filter(
-            Deadline.user_id == current_user.id,
-            Deadline.calendar_synced == False,
-            Deadline.completed == False
-        ).all()
-        
-        synced_count = 0
-        errors = []
-        
-        for deadline in unsynced_deadlines:
-            try:
-                # Create calendar event
-                event = calendar_service.create_event(
-                    title=str(getattr(deadline, 'title')),
-                    description=str(getattr(deadline, 'description', '') or ''),
-                    start_datetime=getattr(deadline, 'date'),
-                    estimated_hours=getattr(deadline, 'estimated_hours', None),
-                    course=getattr(deadline, 'course', None),
-                    priority=str(getattr(deadline, 'priority')),
-                    calendar_id=str(calendar_id)
-                )
-                
-                # Update deadline with calendar event ID
-                setattr(deadline, 'calendar_event_id', event.get('id'))
-                setattr(deadline, 'calendar_synced', True)
-                synced_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to sync deadline {deadline.id}: {e}")
-                errors.append({
-                    "deadline_id": deadline.id,
-                    "title": deadline.title,
-                    "error": str(e)
-                })
+        total_unsynced = await db.scalar(
+            select(func.count()).select_from(Deadline).where(
+                Deadline.user_id == current_user.id,
+                Deadline.calendar_synced == False,
+                Deadline.completed == False
+            )
+        )
         
-        db.commit()
+        sync_job = await enqueue_job_async(
+            db,
+            "calendar.sync_user",
+            {"user_id": current_user.id, "calendar_id": calendar_id},
+            dedupe_key=f"calendar.sync_user:{current_user.id}"
+        )
+        await db.commit()
         
         return {
-            "message": f"Synced {synced_count} deadlines to calendar",
-            "synced_count": synced_count,
-            "total_unsynced": len(unsynced_deadlines),
-            "errors": errors if errors else None
+            "message": f"Syncing {total_unsynced} deadlines to calendar in the background",
+            "total_unsynced": total_unsynced,
+            "sync_job_id": sync_job.id if sync_job else None,
+            "already_queued": sync_job is None
         }
         
     except HTTPException:
@@ -621,7 +558,7 @@ async def sync_all_deadlines(
 async def import_from_calendar(
     days_ahead: int = 30,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Import events from Google Calendar as deadlines
@@ -638,14 +575,14 @@ async def import_from_calendar(
                 detail="Calendar sync is not enabled. Enable it first."
             )
         
-        calendar_service = get_calendar_service()
+        calendar_service = await AsyncCalendarService.shared()
         calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
         
         # Get upcoming events
         time_min = datetime.now(timezone.utc)
         time_max = time_min + timedelta(days=days_ahead)
         
-        events = calendar_service.get_upcoming_events(
+        events = await calendar_service.get_upcoming_events(
             time_min=time_min,
             time_max=time_max,
             calendar_id=calendar_id
@@ -654,15 +591,19 @@ async def import_from_calendar(
         imported_count = 0
         skipped_count = 0
         
+        # Look up already-imported events in one query
+        event_ids = [event.get('id') for event in events if event.get('id')]
+        imported_event_ids = set()
+        if event_ids:
+            imported_event_ids = set((await db.scalars(
+                select(Deadline.calendar_event_id).where(Deadline.calendar_event_id.in_(event_ids))
+            )).all())
+        
         for event in events:
             event_id = event.get('id')
             
             # Skip if already imported
-            existing = db.query(Deadline).filter(
-                Deadline.calendar_event_id == event_id
-            ).first()
-            
-            if existing:
+            if event_id in imported_event_ids:
                 skipped_count += 1
                 continue
             
@@ -704,11 +645,13 @@ async def import_from_calendar(
                 calendar_event_id=event_id,
                 calendar_synced=True
             )
+            schedule_next_reminder(new_deadline)
             
             db.add(new_deadline)
+            imported_event_ids.add(event_id)
             imported_count += 1
         
-        db.commit()
+        await db.commit()
         
         return {
             "message": f"Imported {imported_count} events from calendar",
@@ -732,7 +675,7 @@ async def unsync_deadline(
     deadline_id: int,
     delete_from_calendar: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove calendar sync for a specific deadline
@@ -742,10 +685,10 @@ async def unsync_deadline(
         delete_from_calendar: Whether to also delete the event from Google Calendar
     """
     try:
-        deadline = db.query(Deadline).filter(
+        deadline = await db.scalar(select(Deadline).where(
             Deadline.id == deadline_id,
             Deadline.user_id == current_user.id
-        ).first()
+        ))
         
         if not deadline:
             raise HTTPException(
@@ -760,9 +703,9 @@ async def unsync_deadline(
         
         # Delete from calendar if requested
         if delete_from_calendar and getattr(deadline, 'calendar_event_id', None):
-            calendar_service = get_calendar_service()
+            calendar_service = await AsyncCalendarService.shared()
             calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
-            calendar_service.delete_event(
+            await calendar_service.delete_event(
                 event_id=str(getattr(deadline, 'calendar_event_id')),
                 calendar_id=str(calendar_id)
             )
@@ -770,7 +713,7 @@ async def unsync_deadline(
         # Update deadline
         setattr(deadline, 'calendar_event_id', None)
         setattr(deadline, 'calendar_synced', False)
-        db.commit()
+        await db.commit()
         
         return {
             "message": "Deadline unsynced from calendar",
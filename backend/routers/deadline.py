@@ -1,32 +1,48 @@
 from datetime import datetime, timedelta, timezone
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Response, status, File, UploadFile, BackgroundTasks
-from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status, File, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
+import asyncio
 import logging
 import uuid
 import json
+import base64
 from pydantic import BaseModel
-from typing import List
 
-from db.database import get_db
+from db.database import AsyncSessionLocal, get_async_db
 from models.deadline import Deadline
 from models.user import User
 from models.team import Team
 from models.membership import Membership
-from models.temp_scan import TempScan
-from schemas.deadline import DeadlineCreate, DeadlineResponse, DeadlineUpdate
+from models.temp_scan import ScanStatus, TempScan
+from models.deadline_tombstone import DeadlineTombstone
+from schemas.deadline import (
+    BulkOperationType, DeadlineBulkRequest, DeadlineBulkResponse, DeadlineChanges,
+    DeadlineCreate, DeadlinePage, DeadlineResponse, DeadlineUpdate, PriorityLevel
+)
 from auth.oauth2 import get_current_user
-from services.document_processor import DocumentProcessor
+from services.docx_extraction import DocxFormatError
+from services.document_processor import MODEL_NAME, PROMPT_VERSION, DocumentProcessor, ExtractedDeadline
+from services.extraction_cache import digest_cache_key, get_extraction_cache
+from services.pdf_extraction import PdfLimitError
+from services.upload_spool import (
+    SpooledUpload, UploadTooLargeError, remove_staged_upload, spool_upload, stage_upload
+)
 from services.text_processor import TextProcessor
-from services.calendar_service import get_calendar_service
+from services.google_executor import AsyncCalendarService
+from services.reminder_schedule import schedule_next_reminder
+from services.job_queue import enqueue_job_async
 from core.config import settings
-from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
-# Initialize document processor with Gemini API key
-document_processor = DocumentProcessor(settings.GEMINI_API_KEY)
+# Both share the process-wide Gemini client
+document_processor = DocumentProcessor()
+text_processor = TextProcessor()
+WORD_CONTENT_TYPES = ["application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
 class ScanTextRequest(BaseModel):
     text: str
 router = APIRouter(
@@ -38,8 +54,7 @@ router = APIRouter(
 @router.post("/create", response_model=DeadlineResponse, status_code=status.HTTP_201_CREATED)
 async def create_deadline(
     request: DeadlineCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     # Create new deadline instance
@@ -53,6 +68,7 @@ async def create_deadline(
             estimated_hours=request.estimated_hours,
             user_id=current_user.id  # Associate deadline with current user
         )
+        schedule_next_reminder(new_deadline)
     except Exception as e:
         print(f"Error creating deadline instance: {str(e)}")  # For debugging
         raise HTTPException(
@@ -63,87 +79,316 @@ async def create_deadline(
     try:
         # Add to database session
         db.add(new_deadline)
-        # Commit the transaction
-        db.commit()
-        # Refresh to get the created id and timestamps
-        db.refresh(new_deadline)
+        await db.flush()
         
-        # Sync to Google Calendar if enabled
+        # Calendar event is created by a background job committed with the deadline
         if getattr(current_user, 'calendar_sync_enabled', False):
-            try:
-                # Try to use user's OAuth tokens first
-                try:
-                    from services.calendar_service import get_calendar_service_for_user
-                    calendar_service = get_calendar_service_for_user(current_user)
-                except ValueError:
-                    # Fall back to global calendar service
-                    calendar_service = get_calendar_service()
-                
-                calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
-                
-                event = calendar_service.create_event(
-                    title=str(getattr(new_deadline, 'title')),
-                    description=str(getattr(new_deadline, 'description', '') or ''),
-                    start_datetime=getattr(new_deadline, 'date'),
-                    estimated_hours=getattr(new_deadline, 'estimated_hours', None),
-                    course=getattr(new_deadline, 'course', None),
-                    priority=str(getattr(new_deadline, 'priority')),
-                    calendar_id=calendar_id
-                )
-                
-                # Update deadline with calendar event ID
-                setattr(new_deadline, 'calendar_event_id', event.get('id'))
-                setattr(new_deadline, 'calendar_synced', True)
-                
-                # Save refreshed token if it was updated
-                db.commit()
-                db.refresh(new_deadline)
-                
-                logger.info(f"Synced deadline {new_deadline.id} to user's calendar")
-            except ValueError as e:
-                # User hasn't connected calendar yet
-                logger.warning(f"Calendar not connected for user {current_user.id}: {e}")
-            except Exception as e:
-                logger.error(f"Failed to sync to calendar: {e}")
-                # Don't fail the deadline creation if calendar sync fails
+            await enqueue_job_async(
+                db,
+                "calendar.create_event",
+                {"deadline_id": new_deadline.id},
+                dedupe_key=f"calendar.create_event:{new_deadline.id}"
+            )
+        
+        # Commit the transaction
+        await db.commit()
+        # Refresh to get the created id and timestamps
+        await db.refresh(new_deadline)
         
         return new_deadline
     except Exception as e:
         # Rollback on error
-        db.rollback()
+        await db.rollback()
         print(f"Error creating deadline: {str(e)}")  # For debugging
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create deadline: {str(e)}"
         )
 
+@router.post("/bulk", response_model=DeadlineBulkResponse)
+async def bulk_mutate_deadlines(
+    request: DeadlineBulkRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply many create/update/complete/delete operations in one transaction
+
+    Invalid operations are reported per item and skipped; the rest commit together.
+    Calendar side effects are queued as a single background job.
+    """
+    operations = request.operations
+    target_ids = {
+        operation.id for operation in operations
+        if operation.op != BulkOperationType.create and operation.id is not None
+    }
+    existing = {}
+    if target_ids:
+        existing = {
+            deadline.id: deadline
+            for deadline in (await db.scalars(select(Deadline).where(
+                Deadline.user_id == current_user.id,
+                Deadline.id.in_(target_ids)
+            ))).all()
+        }
+
+    results = []
+    created = []  # (result index, new deadline) pairs; ids are known after the flush
+    calendar_updates = []
+    calendar_deletes = []
+    for index, operation in enumerate(operations):
+        result = {"index": index, "op": operation.op, "id": operation.id, "ok": False}
+        results.append(result)
+
+        if operation.op == BulkOperationType.create:
+            if operation.deadline is None:
+                result["error"] = "deadline is required for create"
+                continue
+            new_deadline = Deadline(**operation.deadline.dict(), user_id=current_user.id)
+            schedule_next_reminder(new_deadline)
+            db.add(new_deadline)
+            created.append((index, new_deadline))
+            result["ok"] = True
+            continue
+
+        deadline = existing.get(operation.id)
+        if deadline is None:
+            result["error"] = f"Deadline with id {operation.id} not found"
+            continue
+
+        if operation.op == BulkOperationType.delete:
+            if getattr(deadline, 'calendar_synced', False) and getattr(deadline, 'calendar_event_id', None):
+                calendar_deletes.append(str(getattr(deadline, 'calendar_event_id')))
+            db.add(DeadlineTombstone(deadline_id=deadline.id, user_id=deadline.user_id))
+            await db.delete(deadline)
+            # Later operations on the same id see it as gone
+            del existing[operation.id]
+        else:
+            if operation.op == BulkOperationType.update:
+                if operation.changes is None:
+                    result["error"] = "changes are required for update"
+                    continue
+                update_data = operation.changes.dict(exclude_unset=True)
+            else:
+                update_data = {"completed": True}
+            for field, value in update_data.items():
+                setattr(deadline, field, value)
+            if 'date' in update_data or 'completed' in update_data:
+                schedule_next_reminder(deadline)
+            if (getattr(deadline, 'calendar_synced', False) and getattr(deadline, 'calendar_event_id', None)
+                    and deadline.id not in calendar_updates):
+                calendar_updates.append(deadline.id)
+        result["ok"] = True
+
+    try:
+        # One flush: batched INSERT ... RETURNING for creates, executemany for updates and deletes
+        await db.flush()
+        for index, new_deadline in created:
+            results[index]["id"] = new_deadline.id
+
+        if getattr(current_user, 'calendar_sync_enabled', False):
+            calendar_updates = [deadline_id for deadline_id in calendar_updates if deadline_id in existing]
+            if created or calendar_updates or calendar_deletes:
+                await enqueue_job_async(db, "calendar.sync_deadlines", {
+                    "user_id": current_user.id,
+                    "calendar_id": getattr(current_user, 'calendar_id', None) or "primary",
+                    "create": [new_deadline.id for _, new_deadline in created],
+                    "update": calendar_updates,
+                    "delete": calendar_deletes
+                })
+
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Bulk deadline mutation failed for user {current_user.id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to apply bulk operations"
+        )
+
+    return {"results": results}
+
+def _collection_etag(scope: str, owner_id: int, version: int) -> str:
+    return f'W/"{scope}{owner_id}-{version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == wanted:
+            return True
+    return False
+
+
 @router.get("/", response_model=List[DeadlineResponse])
 async def get_deadlines(
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all deadlines for the current user
+
+    Sends a weak ETag; a matching If-None-Match gets 304 without loading the rows.
     """
-    deadlines = db.query(Deadline)\
-        .filter(Deadline.user_id == current_user.id)\
-        .all()
+    etag = _collection_etag("u", current_user.id, current_user.deadlines_version)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    deadlines = (await db.scalars(
+        select(Deadline).where(Deadline.user_id == current_user.id)
+    )).all()
     return deadlines
 
+def _encode_cursor(deadline: Deadline) -> str:
+    raw = json.dumps({"date": deadline.date.isoformat(), "id": deadline.id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(data["date"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _encode_sync_token(at: datetime) -> str:
+    raw = json.dumps({"at": at.isoformat()})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_sync_token(token: str) -> datetime:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        at = datetime.fromisoformat(data["at"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+
+# Re-send changes this close to the token: a write whose transaction started before the
+# previous poll may commit after it. Clients upsert, so the overlap is harmless.
+SYNC_OVERLAP = timedelta(seconds=10)
+
+
+@router.get("/changes", response_model=DeadlineChanges)
+async def get_deadline_changes(
+    since: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get deadlines created, updated or deleted since a sync token
+
+    Without `since` (or with a token older than tombstone retention) the full list
+    is returned with reset=true.
+    """
+    now = await db.scalar(select(func.now()))
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+
+    since_at = _decode_sync_token(since) if since else None
+    retention = timedelta(days=settings.DEADLINE_TOMBSTONE_RETENTION_DAYS)
+    if since_at is None or since_at < now - retention:
+        deadlines = (await db.scalars(
+            select(Deadline).where(Deadline.user_id == current_user.id)
+        )).all()
+        return {"changed": deadlines, "deleted": [], "next_token": _encode_sync_token(now), "reset": True}
+
+    after = since_at - SYNC_OVERLAP
+    changed = (await db.scalars(
+        select(Deadline).where(
+            Deadline.user_id == current_user.id,
+            Deadline.updated_at > after
+        ).order_by(Deadline.updated_at)
+    )).all()
+    deleted = (await db.scalars(
+        select(DeadlineTombstone.deadline_id).where(
+            DeadlineTombstone.user_id == current_user.id,
+            DeadlineTombstone.deleted_at > after
+        )
+    )).all()
+    return {
+        "changed": changed,
+        "deleted": list(set(deleted)),
+        "next_token": _encode_sync_token(now),
+        "reset": False
+    }
+
+
+@router.get("/page", response_model=DeadlinePage)
+async def get_deadlines_page(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    completed: Optional[bool] = None,
+    course: Optional[str] = None,
+    priority: Optional[PriorityLevel] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    team_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get one page of the current user's deadlines, ordered by (date, id)
+
+    Pass the returned next_cursor back as `cursor` to continue; it is null on the last page.
+    """
+    query = select(Deadline).where(Deadline.user_id == current_user.id)
+    if completed is not None:
+        query = query.where(Deadline.completed == completed)
+    if course is not None:
+        query = query.where(Deadline.course == course)
+    if priority is not None:
+        query = query.where(Deadline.priority == priority.value)
+    if date_from is not None:
+        query = query.where(Deadline.date >= date_from)
+    if date_to is not None:
+        query = query.where(Deadline.date < date_to)
+    if team_id is not None:
+        query = query.where(Deadline.team_id == team_id)
+    if cursor:
+        after_date, after_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Deadline.date > after_date,
+            and_(Deadline.date == after_date, Deadline.id > after_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.scalars(
+        query.order_by(Deadline.date, Deadline.id).limit(limit + 1)
+    )).all()
+    items = rows[:limit]
+    next_cursor = _encode_cursor(items[-1]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.get("/{deadline_id}", response_model=DeadlineResponse)
 async def get_deadline(
     deadline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific deadline by ID
     """
-    deadline = db.query(Deadline)\
-        .filter(
-            Deadline.id == deadline_id,
-            Deadline.user_id == current_user.id
-        ).first()
+    deadline = await db.scalar(select(Deadline).where(
+        Deadline.id == deadline_id,
+        Deadline.user_id == current_user.id
+    ))
     
     if not deadline:
         raise HTTPException(
@@ -156,18 +401,17 @@ async def get_deadline(
 async def update_deadline(
     deadline_id: int,
     request: DeadlineUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update a deadline
     """
     # First, get existing deadline
-    deadline = db.query(Deadline)\
-        .filter(
-            Deadline.id == deadline_id,
-            Deadline.user_id == current_user.id
-        ).first()
+    deadline = await db.scalar(select(Deadline).where(
+        Deadline.id == deadline_id,
+        Deadline.user_id == current_user.id
+    ))
     
     if not deadline:
         raise HTTPException(
@@ -179,27 +423,24 @@ async def update_deadline(
     update_data = request.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(deadline, field, value)
+    if 'date' in update_data or 'completed' in update_data:
+        schedule_next_reminder(deadline)
     
     try:
-        db.commit()
-        db.refresh(deadline)
+        await db.commit()
+        await db.refresh(deadline)
         
         # Sync changes to Google Calendar if enabled and synced
         if (getattr(current_user, 'calendar_sync_enabled', False) and 
             getattr(deadline, 'calendar_synced', False) and 
             getattr(deadline, 'calendar_event_id', None)):
             try:
-                # Try to use user's OAuth tokens first
-                try:
-                    from services.calendar_service import get_calendar_service_for_user
-                    calendar_service = get_calendar_service_for_user(current_user)
-                except ValueError:
-                    # Fall back to global calendar service
-                    calendar_service = get_calendar_service()
+                # User's OAuth tokens first, falling back to the global calendar service
+                calendar_service = await AsyncCalendarService.for_user(current_user)
                 
                 calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
                 
-                calendar_service.update_event(
+                await calendar_service.update_event(
                     event_id=str(getattr(deadline, 'calendar_event_id')),
                     title=str(getattr(deadline, 'title')) if 'title' in update_data else None,
                     description=str(getattr(deadline, 'description', '')) if 'description' in update_data else None,
@@ -220,7 +461,7 @@ async def update_deadline(
         
         return deadline
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update deadline"
@@ -229,17 +470,16 @@ async def update_deadline(
 @router.delete("/{deadline_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_deadline(
     deadline_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete a deadline
     """
-    deadline = db.query(Deadline)\
-        .filter(
-            Deadline.id == deadline_id,
-            Deadline.user_id == current_user.id
-        ).first()
+    deadline = await db.scalar(select(Deadline).where(
+        Deadline.id == deadline_id,
+        Deadline.user_id == current_user.id
+    ))
     
     if not deadline:
         raise HTTPException(
@@ -253,16 +493,11 @@ async def delete_deadline(
             getattr(deadline, 'calendar_synced', False) and 
             getattr(deadline, 'calendar_event_id', None)):
             try:
-                # Try to use user's OAuth tokens first
-                try:
-                    from services.calendar_service import get_calendar_service_for_user
-                    calendar_service = get_calendar_service_for_user(current_user)
-                except ValueError:
-                    # Fall back to global calendar service
-                    calendar_service = get_calendar_service()
+                # User's OAuth tokens first, falling back to the global calendar service
+                calendar_service = await AsyncCalendarService.for_user(current_user)
                 
                 calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
-                calendar_service.delete_event(
+                await calendar_service.delete_event(
                     event_id=str(getattr(deadline, 'calendar_event_id')),
                     calendar_id=calendar_id
                 )
@@ -273,11 +508,12 @@ async def delete_deadline(
                 logger.error(f"Failed to delete calendar event: {e}")
                 # Continue with deadline deletion even if calendar delete fails
         
-        db.delete(deadline)
-        db.commit()
+        db.add(DeadlineTombstone(deadline_id=deadline.id, user_id=deadline.user_id))
+        await db.delete(deadline)
+        await db.commit()
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete deadline"
@@ -287,72 +523,53 @@ async def delete_deadline(
 @router.post("/scan-document")
 async def scan_document(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Scan a document for deadlines, store them temporarily in database, and return a temp_id for later saving.
+
+    With background=true the scan is queued as a scan.document job: the response is 202 with the temp_id, and
+    progress is available from GET /deadlines/scan-jobs/{temp_id} (or its /events stream).
     """
     import logging
     logger = logging.getLogger(__name__)
     try:
-        allowed_types = ["application/pdf", "text/plain", "text/csv", "application/msword", 
-                        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
+        allowed_types = ["application/pdf", "text/plain", "text/csv", *WORD_CONTENT_TYPES]
         if file.content_type not in allowed_types:
             logger.error(f"Unsupported file type: {file.content_type}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported file type: {file.content_type}. Supported types: PDF, TXT, CSV, DOC, DOCX"
             )
-        content = await file.read()
-        if file.content_type == "application/pdf":
-            text_content = document_processor.extract_text_from_pdf(content)
-        elif file.content_type in ["text/plain", "text/csv"]:
-            try:
-                text_content = content.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    text_content = content.decode('latin-1')
-                except UnicodeDecodeError:
-                    logger.error("Cannot decode text file. Not UTF-8 or Latin-1.")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Cannot decode text file. Please ensure it's in UTF-8 or Latin-1 encoding."
-                    )
-        else:
+        try:
+            upload = await spool_upload(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        if background:
             try:
-                text_content = content.decode('utf-8')
-            except UnicodeDecodeError:
-                logger.error(f"Cannot process {file.content_type} files yet. Not UTF-8.")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Cannot process {file.content_type} files yet. Please convert to PDF or TXT format."
+                temp_id = await _create_scan_job(
+                    db, current_user.id, "document",
+                    upload=upload, content_type=file.content_type, filename=file.filename
                 )
-        if not text_content.strip():
-            logger.error("No text content found in the document.")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No text content found in the document"
+            finally:
+                upload.close()
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"temp_id": temp_id, "status": ScanStatus.pending.value}
             )
-        extracted_deadlines = await document_processor.extract_deadlines(text_content)
+        try:
+            extracted_deadlines = await _extract_document(upload, file.content_type)
+        finally:
+            upload.close()
         if not extracted_deadlines:
-            logger.error(f"No deadlines found in document. Text: {text_content[:200]}")
+            logger.error(f"No deadlines found in document {file.filename} ({upload.size} bytes)")
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="No deadlines found in document"
             )
-        deadline_dicts = [
-            {
-                "title": d.title,
-                "description": d.description,
-                "course": d.course,
-                "date": d.date.isoformat() if hasattr(d.date, 'isoformat') else str(d.date),
-                "priority": d.priority,
-                "estimated_hours": getattr(d, "estimated_hours", 0),
-                "_tempKey": str(uuid.uuid4()),
-            }
-            for d in extracted_deadlines
-        ]
+        deadline_dicts = _scan_results(extracted_deadlines)
         logger.info(f"Extracted deadlines with temp keys: {deadline_dicts}")
         # Generate temp_id
         temp_id = str(uuid.uuid4())
@@ -365,10 +582,12 @@ async def scan_document(
             expires_at=datetime.now(timezone.utc) + timedelta(hours=1)  # 1 hour expiry
         )
         db.add(temp_scan)
-        db.commit()
+        await db.commit()
         
         logger.info(f"Scan successful. temp_id={temp_id}, deadlines_found={len(deadline_dicts)}")
         return {"temp_id": temp_id, "deadlines": deadline_dicts}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing document: {str(e)}")
         raise HTTPException(
@@ -379,15 +598,17 @@ async def scan_document(
 @router.post("/scan-text")
 async def scan_text(
     request: ScanTextRequest,
-    db: Session = Depends(get_db),
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Scan text for deadlines, store them temporarily in database, and return a temp_id for later saving.
+
+    With background=true the scan runs as a job, as for /scan-document.
     """
     import logging
     logger = logging.getLogger(__name__)
-    text_processor = TextProcessor(settings.GEMINI_API_KEY)
     try:
         text_content = request.text.strip()
     
@@ -398,6 +619,13 @@ async def scan_text(
                 detail="No deadlines found in the document"
             )
         
+        if background:
+            temp_id = await _create_scan_job(db, current_user.id, "text", text=text_content)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={"temp_id": temp_id, "status": ScanStatus.pending.value}
+            )
+        
         extracted_deadlines = await text_processor.extract_deadlines(text_content)
         
         if not extracted_deadlines:
@@ -407,18 +635,7 @@ async def scan_text(
                 detail="No deadlines found in document"
             )
         
-        deadline_dicts = [
-            {
-                "title": d.title,
-                "description": d.description,
-                "course": d.course,
-                "date": d.date.isoformat(),
-                "priority": d.priority,
-                "estimated_hours": getattr(d, "estimated_hours", 0),
-                "_tempKey": str(uuid.uuid4())
-            } 
-            for d in extracted_deadlines
-        ]
+        deadline_dicts = _scan_results(extracted_deadlines)
         logger.info(f"Extracted deadlines with temp keys: {deadline_dicts}")
         temp_id = str(uuid.uuid4())
 
@@ -429,7 +646,7 @@ async def scan_text(
             expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
         ) 
         db.add(temp_scan)
-        db.commit()
+        await db.commit()
 
         logger.info(f"Scan successful. temp_id={temp_id}, deadlines_found={len(deadline_dicts)}")
         return {"temp_id": temp_id, "deadlines": deadline_dicts}
@@ -439,6 +656,322 @@ async def scan_text(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error processing text: {str(e)}"
         )
+
+
+async def _extract_document(
+    upload: SpooledUpload,
+    content_type: Optional[str],
+    on_progress=None
+) -> List[ExtractedDeadline]:
+    """Deadlines in an uploaded document; a byte-identical earlier upload is answered from the cache unparsed"""
+    key = digest_cache_key(upload.sha256, str(content_type), PROMPT_VERSION, MODEL_NAME)
+    cached = await get_extraction_cache().get(key)
+    if cached is not None:
+        logger.info(f"Upload {upload.sha256[:12]} answered from the extraction cache")
+        return [ExtractedDeadline(**d) for d in cached]
+    text_content = await _document_text(upload, content_type)
+    return await document_processor.extract_deadlines(text_content, on_progress=on_progress, cache_as=key)
+
+
+async def _document_text(upload: SpooledUpload, content_type: Optional[str]) -> str:
+    """Text of an uploaded document (HTTPException if it can't be read or is empty)"""
+    if content_type == "application/pdf":
+        try:
+            # Parsed straight from the spooled bytes or temp file path, without another copy
+            text_content = await document_processor.extract_text_from_pdf(upload.source)
+        except PdfLimitError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        return _require_text(text_content)
+    if content_type in WORD_CONTENT_TYPES:
+        try:
+            # Browsers often label DOCX files application/msword, so the container decides
+            text_content = await document_processor.extract_text_from_docx(upload.source)
+        except DocxFormatError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return _require_text(text_content)
+
+    content = upload.read_bytes()
+    if content_type in ["text/plain", "text/csv"]:
+        try:
+            text_content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            try:
+                text_content = content.decode('latin-1')
+            except UnicodeDecodeError:
+                logger.error("Cannot decode text file. Not UTF-8 or Latin-1.")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cannot decode text file. Please ensure it's in UTF-8 or Latin-1 encoding."
+                )
+    else:
+        try:
+            text_content = content.decode('utf-8')
+        except UnicodeDecodeError:
+            logger.error(f"Cannot process {content_type} files yet. Not UTF-8.")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot process {content_type} files yet. Please convert to PDF or TXT format."
+            )
+    return _require_text(text_content)
+
+
+def _require_text(text_content: str) -> str:
+    if not text_content.strip():
+        logger.error("No text content found in the document.")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No text content found in the document"
+        )
+    return text_content
+
+
+def _scan_results(extracted_deadlines) -> List[dict]:
+    """Extracted deadlines as stored in TempScan, each with a _tempKey for save-scanned"""
+    return [
+        {
+            "title": d.title,
+            "description": d.description,
+            "course": d.course,
+            "date": d.date.isoformat() if hasattr(d.date, 'isoformat') else str(d.date),
+            "priority": d.priority,
+            "estimated_hours": getattr(d, "estimated_hours", 0),
+            "_tempKey": str(uuid.uuid4()),
+        }
+        for d in extracted_deadlines
+    ]
+
+
+# One retry covers a worker that died mid-scan; extraction errors fail the scan directly
+SCAN_JOB_MAX_ATTEMPTS = 2
+# A running scan whose claim is not renewed within this may be taken over by the retry;
+# shorter than the job's visibility timeout so it has lapsed by the time the job is reclaimed
+SCAN_CLAIM_TTL = timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 2)
+
+
+async def _create_scan_job(
+    db: AsyncSession,
+    user_id: int,
+    kind: str,
+    text: Optional[str] = None,
+    upload: Optional[SpooledUpload] = None,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> str:
+    """Store a pending TempScan (staging the uploaded document, if any) and queue its scan job"""
+    temp_id = str(uuid.uuid4())
+    upload_path = None
+    if upload is not None:
+        # Moving the file may copy it across filesystems
+        upload_path = await asyncio.get_running_loop().run_in_executor(None, stage_upload, upload, temp_id)
+    try:
+        db.add(TempScan(
+            temp_id=temp_id,
+            user_id=user_id,
+            deadlines_json="[]",
+            status=ScanStatus.pending.value,
+            upload_path=upload_path,
+            upload_content_type=content_type,
+            upload_filename=filename,
+            expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
+        ))
+        payload = {"temp_id": temp_id}
+        if text is not None:
+            payload["text"] = text
+        await enqueue_job_async(
+            db, f"scan.{kind}", payload,
+            dedupe_key=f"scan:{temp_id}",
+            max_attempts=SCAN_JOB_MAX_ATTEMPTS
+        )
+        await db.commit()
+    except Exception:
+        if upload_path is not None:
+            remove_staged_upload(upload_path)
+        raise
+    return temp_id
+
+
+async def _update_scan_job(temp_id: str, **values):
+    # Own short session: scan jobs run outside any request
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(TempScan).where(TempScan.temp_id == temp_id).values(**values))
+        await db.commit()
+
+
+async def _claim_scan(temp_id: str):
+    """
+    Mark a scan running for this job; None if it is finished, expired or still claimed elsewhere
+
+    A running scan is only taken over once its claim has lapsed (the worker died).
+    """
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(TempScan)
+            .where(
+                TempScan.temp_id == temp_id,
+                TempScan.expires_at > now,
+                or_(
+                    TempScan.status == ScanStatus.pending.value,
+                    and_(
+                        TempScan.status == ScanStatus.running.value,
+                        or_(TempScan.locked_until.is_(None), TempScan.locked_until < now)
+                    )
+                )
+            )
+            .values(status=ScanStatus.running.value, locked_until=now + SCAN_CLAIM_TTL)
+            .returning(TempScan.upload_path, TempScan.upload_content_type)
+        )
+        claimed = result.first()
+        await db.commit()
+    return claimed
+
+
+async def _renew_scan_claim(temp_id: str):
+    while True:
+        await asyncio.sleep(SCAN_CLAIM_TTL.total_seconds() / 3)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(TempScan)
+                    .where(TempScan.temp_id == temp_id, TempScan.status == ScanStatus.running.value)
+                    .values(locked_until=datetime.now(timezone.utc) + SCAN_CLAIM_TTL)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Failed to renew claim on scan {temp_id}: {e}")
+
+
+async def run_scan_job(temp_id: str, kind: str, text: Optional[str] = None) -> dict:
+    """
+    Body of the scan.document / scan.text jobs; progress and results land in the TempScan row
+
+    The scan is claimed first and the claim renewed while it runs, so a reclaimed job
+    never scans a finished scan again or one another worker is still running.
+    """
+    claimed = await _claim_scan(temp_id)
+    if claimed is None:
+        return {"skipped": True}
+    upload_path, content_type = claimed
+
+    heartbeat = asyncio.create_task(_renew_scan_claim(temp_id))
+    upload = None
+    finished = {"locked_until": None, "upload_path": None}
+    try:
+        async def on_progress(chunks_done: int, chunks_total: int, found) -> None:
+            await _update_scan_job(
+                temp_id,
+                chunks_done=chunks_done,
+                chunks_total=chunks_total,
+                deadlines_json=json.dumps(_scan_results(found))
+            )
+
+        if kind == "document":
+            if not upload_path or not os.path.exists(upload_path):
+                raise ValueError("Uploaded document is missing")
+            loop = asyncio.get_running_loop()
+            upload = await loop.run_in_executor(None, SpooledUpload.from_path, upload_path)
+            extracted_deadlines = await _extract_document(upload, content_type, on_progress=on_progress)
+        else:
+            extracted_deadlines = await text_processor.extract_deadlines(text or "")
+
+        if not extracted_deadlines:
+            await _update_scan_job(
+                temp_id, status=ScanStatus.failed.value, error="No deadlines found in document", **finished
+            )
+            return {"deadlines_found": 0}
+        await _update_scan_job(
+            temp_id,
+            status=ScanStatus.done.value,
+            deadlines_json=json.dumps(_scan_results(extracted_deadlines)),
+            **finished
+        )
+        logger.info(f"Scan job {temp_id} finished, deadlines_found={len(extracted_deadlines)}")
+        return {"deadlines_found": len(extracted_deadlines)}
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Scan job {temp_id} failed: {error}")
+        # Recording the failure may raise too; the job is then retried or swept as stale
+        await _update_scan_job(temp_id, status=ScanStatus.failed.value, error=str(error), **finished)
+        return {"error": str(error)}
+    finally:
+        heartbeat.cancel()
+        if upload is not None:
+            # Removes the staged file
+            upload.close()
+
+
+def _scan_job_state(temp_scan: TempScan) -> dict:
+    return {
+        "temp_id": temp_scan.temp_id,
+        "status": temp_scan.status,
+        "chunks_done": temp_scan.chunks_done,
+        "chunks_total": temp_scan.chunks_total,
+        "error": temp_scan.error,
+        "deadlines": json.loads(str(temp_scan.deadlines_json)),
+    }
+
+
+async def _get_scan_job(db: AsyncSession, temp_id: str, user_id: int) -> Optional[TempScan]:
+    return await db.scalar(select(TempScan).where(
+        TempScan.temp_id == temp_id,
+        TempScan.user_id == user_id,
+        TempScan.expires_at > datetime.now(timezone.utc)
+    ))
+
+
+@router.get("/scan-jobs/{temp_id}")
+async def get_scan_job(
+    temp_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Poll a background scan: status, chunk progress and the deadlines found so far
+    """
+    temp_scan = await _get_scan_job(db, temp_id, current_user.id)
+    if not temp_scan:
+        raise HTTPException(status_code=404, detail="Session expired or not found")
+    return _scan_job_state(temp_scan)
+
+
+# How often the event stream re-reads the scan row
+SCAN_EVENTS_POLL_SECONDS = 1.0
+
+
+@router.get("/scan-jobs/{temp_id}/events")
+async def stream_scan_job(
+    temp_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for a background scan: a `progress` event on every change, then `done` or `failed`
+    """
+    user_id = current_user.id
+
+    async def events():
+        last_state = None
+        while True:
+            async with AsyncSessionLocal() as db:
+                temp_scan = await _get_scan_job(db, temp_id, user_id)
+                state = _scan_job_state(temp_scan) if temp_scan else None
+            if state is None:
+                yield f"event: failed\ndata: {json.dumps({'error': 'Session expired or not found'})}\n\n"
+                return
+            if state != last_state:
+                last_state = state
+                finished = state["status"] in (ScanStatus.done.value, ScanStatus.failed.value)
+                event = state["status"] if finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(state)}\n\n"
+                if finished:
+                    return
+            await asyncio.sleep(SCAN_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 class SaveScannedRequest(BaseModel):
     temp_id: str
     selected_keys: List[str]
@@ -446,7 +979,7 @@ class SaveScannedRequest(BaseModel):
 @router.post("/save-scanned")
 async def save_scanned(
     request: SaveScannedRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     logger.info(f"Save scanned request - temp_id: {request.temp_id}, selected_keys: {request.selected_keys}, user_id: {current_user.id}")
@@ -454,15 +987,21 @@ async def save_scanned(
     temp_id = request.temp_id
     selected_keys = request.selected_keys
 
-    temp_scan = db.query(TempScan).filter(
+    # Row lock: a concurrent save of the same scan waits, then finds it consumed
+    temp_scan = await db.scalar(select(TempScan).where(
         TempScan.temp_id == temp_id,
         TempScan.user_id == current_user.id,
         TempScan.expires_at > datetime.now(timezone.utc)
-    ).first()
+    ).with_for_update())
 
     if not temp_scan:
         logger.error(f"Temp scan not found or expired - temp_id: {temp_id}, user_id: {current_user.id}")
         raise HTTPException(status_code=404, detail="Session expired or not found")
+    if temp_scan.status != ScanStatus.done.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Scan is {temp_scan.status}, results can be saved once it is done"
+        )
 
     all_deadlines = json.loads(str(temp_scan.deadlines_json))
     logger.info(f"All deadlines from temp_scan: {all_deadlines}")
@@ -471,46 +1010,67 @@ async def save_scanned(
     to_save = [d for d in all_deadlines if d.get("_tempKey") in selected_keys]
     logger.info(f"Deadlines to save: {to_save}")
     
-    saved = []
-
+    # Validate every row up front; failures are reported instead of aborting the save
+    pending = []
+    errors = []
     for d in to_save:
         try:
-            new_deadline = Deadline(
+            fields = DeadlineCreate(
                 title=d["title"],
-                description=d["description"],
-                course=d["course"],
-                date=datetime.fromisoformat(d["date"]),
-                priority=d["priority"],
-                estimated_hours=d.get("estimated_hours", 0),
-                user_id=current_user.id
+                description=d.get("description"),
+                course=d.get("course"),
+                date=d["date"],
+                priority=d.get("priority") or "medium",
+                estimated_hours=d.get("estimated_hours") or 0
             )
-            db.add(new_deadline)
-            db.commit()
-            db.refresh(new_deadline)
-            saved.append({"id": new_deadline.id, **d})
-            logger.info(f"Successfully saved deadline: {new_deadline.id}")
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Failed to save deadline: {e}", exc_info=True)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Skipping invalid scanned deadline {d.get('_tempKey')}: {e}")
+            errors.append({"_tempKey": d.get("_tempKey"), "error": str(e)})
+            continue
+        new_deadline = Deadline(**fields.dict(), user_id=current_user.id)
+        schedule_next_reminder(new_deadline)
+        pending.append((d, new_deadline))
 
+    try:
+        db.add_all([new_deadline for _, new_deadline in pending])
+        # One multi-row INSERT ... RETURNING id; the saved entries leave the scan in the same
+        # transaction so they can't be saved twice (the frontend saves one key at a time)
+        await db.flush()
+        # Rows that failed validation stay so they can be fixed or retried
+        saved_keys = {d.get("_tempKey") for d, _ in pending}
+        remaining = [d for d in all_deadlines if d.get("_tempKey") not in saved_keys]
+        if remaining:
+            setattr(temp_scan, 'deadlines_json', json.dumps(remaining))
+        else:
+            await db.delete(temp_scan)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to save scanned deadlines: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save scanned deadlines"
+        )
+
+    saved = [{"id": new_deadline.id, **d} for d, new_deadline in pending]
     logger.info(f"Save complete - saved {len(saved)} out of {len(to_save)} deadlines")
-    return {"status": "saved", "count": len(saved), "deadlines": saved}
+    return {"status": "saved", "count": len(saved), "deadlines": saved, "errors": errors}
 
 @router.post("/{deadline_id}/assign-team/{team_id}", response_model=DeadlineResponse)
 async def assign_deadline_to_team(
     deadline_id: int,
     team_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Assign a deadline to a team for sharing
     """
     # Get the deadline and check ownership
-    deadline = db.query(Deadline).filter(
+    deadline = await db.scalar(select(Deadline).where(
         Deadline.id == deadline_id,
         Deadline.user_id == current_user.id
-    ).first()
+    ))
     
     if not deadline:
         raise HTTPException(
@@ -519,10 +1079,10 @@ async def assign_deadline_to_team(
         )
     
     # Check if user is a member of the team
-    membership = db.query(Membership).filter(
+    membership = await db.scalar(select(Membership).where(
         Membership.team_id == team_id,
         Membership.user_id == current_user.id
-    ).first()
+    ))
     
     if not membership:
         raise HTTPException(
@@ -531,7 +1091,7 @@ async def assign_deadline_to_team(
         )
     
     # Check if team exists
-    team = db.query(Team).filter(Team.id == team_id).first()
+    team = await db.get(Team, team_id)
     if not team:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -542,11 +1102,11 @@ async def assign_deadline_to_team(
     setattr(deadline, 'team_id', team_id)
     
     try:
-        db.commit()
-        db.refresh(deadline)
+        await db.commit()
+        await db.refresh(deadline)
         return deadline
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to assign deadline to team"
@@ -555,17 +1115,21 @@ async def assign_deadline_to_team(
 @router.get("/team/{team_id}", response_model=List[DeadlineResponse])
 async def get_team_deadlines(
     team_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all deadlines assigned to a team
+
+    Sends a weak ETag; a matching If-None-Match gets 304 without loading the rows.
     """
     # Check if user is a member of the team
-    membership = db.query(Membership).filter(
+    membership = await db.scalar(select(Membership).where(
         Membership.team_id == team_id,
         Membership.user_id == current_user.id
-    ).first()
+    ))
     
     if not membership:
         raise HTTPException(
@@ -573,9 +1137,15 @@ async def get_team_deadlines(
             detail="You are not a member of this team"
         )
     
+    version = await db.scalar(select(Team.deadlines_version).where(Team.id == team_id))
+    etag = _collection_etag("t", team_id, version or 0)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
     # Get team deadlines
-    deadlines = db.query(Deadline).filter(
-        Deadline.team_id == team_id
-    ).all()
+    deadlines = (await db.scalars(
+        select(Deadline).where(Deadline.team_id == team_id)
+    )).all()
     
     return deadlines
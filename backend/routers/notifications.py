@@ -2,6 +2,7 @@
 Notification endpoints for deadline reminders
 """
 import logging
+import uuid
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
@@ -46,13 +47,19 @@ async def send_test_notification(user_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="No active deadlines found for user")
         
         notification_service = get_notification_service()  # Updated usage
-        success = notification_service.send_deadline_notification(user, deadline, "approaching")
+        success = notification_service.queue_deadline_notification(
+            db, user, deadline, "approaching",
+            idempotency_key=f"test:{user_id}:{deadline.id}:{uuid.uuid4()}"
+        )
         
         if success:
-            return {"message": f"Test notification sent to {user.email}"}
+            db.commit()
+            return {"message": f"Test notification queued for {user.email}"}
         else:
             raise HTTPException(status_code=500, detail="Failed to send test notification")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error sending test notification: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to send test notification")
@@ -65,7 +72,7 @@ async def send_daily_digest(user_id: int):
         success = notification_service.send_daily_digest(user_id)
         
         if success:
-            return {"message": f"Daily digest sent to user {user_id}"}
+            return {"message": f"Daily digest queued for user {user_id}"}
         else:
             raise HTTPException(status_code=404, detail="User not found or no deadlines")
             
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from fastapi.security import OAuth2PasswordRequestForm
 from passlib.context import CryptContext
@@ -8,11 +10,12 @@ from datetime import timedelta
 # Use pbkdf2_sha256 instead of bcrypt to avoid 72-byte password limitation
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
-from db.database import get_db
+from db.database import get_async_db
 from models.user import User
 from schemas.user import UserCreate, UserResponse, UserUpdate, CalendarPreferencesUpdate
 from auth.oauth2 import create_access_token, get_current_user
-from services.calendar_service import get_calendar_service
+from services.google_executor import AsyncCalendarService
+from services.job_queue import enqueue_job_async
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,24 +26,24 @@ router = APIRouter(
 )
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if email exists
-    if db.query(User).filter(User.email == user.email).first():
+    if await db.scalar(select(User.id).where(User.email == user.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Check if username exists
-    if db.query(User).filter(User.username == user.username).first():
+    if await db.scalar(select(User.id).where(User.username == user.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
 
-    # Hash the password
-    hashed_password = pwd_context.hash(user.password)
+    # Hash the password (CPU-bound, keep it off the event loop)
+    hashed_password = await run_in_threadpool(pwd_context.hash, user.password)
     
     db_user = User(
         email=user.email,
@@ -49,14 +52,14 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
         calendar_sync_enabled=True  # Enable calendar sync by default for new users
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     # Important: form_data.username contains the email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     
     if not user:
         raise HTTPException(
@@ -64,7 +67,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
             detail="Incorrect email or password"
         )
     
-    if not pwd_context.verify(form_data.password, user.hashed_password):
+    if not await run_in_threadpool(pwd_context.verify, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -83,18 +86,18 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 @router.put("/me", response_model=UserResponse)
 async def update_user(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     if user_update.email and user_update.email != current_user.email:
-        if db.query(User).filter(User.email == user_update.email).first():
+        if await db.scalar(select(User.id).where(User.email == user_update.email)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
     
     if user_update.username and user_update.username != current_user.username:
-        if db.query(User).filter(User.username == user_update.username).first():
+        if await db.scalar(select(User.id).where(User.username == user_update.username)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
@@ -102,13 +105,13 @@ async def update_user(
     
     for key, value in user_update.dict(exclude_unset=True).items():
         if key == "password" and value:
-            value = pwd_context.hash(value)
+            value = await run_in_threadpool(pwd_context.hash, value)
             setattr(current_user, "hashed_password", value)
         else:
             setattr(current_user, key, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     return current_user
 
 
@@ -132,7 +135,7 @@ async def get_calendar_preferences(
 @router.put("/me/calendar-preferences")
 async def update_calendar_preferences(
     preferences: CalendarPreferencesUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -142,7 +145,7 @@ async def update_calendar_preferences(
     - Enable or disable calendar sync
     - Change which calendar to sync to (default: "primary")
     
-    When enabling calendar sync for the first time, all existing deadlines will be synced.
+    When enabling calendar sync for the first time, all existing deadlines are synced in the background.
     """
     try:
         # Track previous sync state
@@ -153,8 +156,7 @@ async def update_calendar_preferences(
             # Check if user has OAuth tokens (per-user calendar)
             if getattr(current_user, 'calendar_token', None):
                 try:
-                    from services.calendar_service import get_calendar_service_for_user
-                    get_calendar_service_for_user(current_user)
+                    await AsyncCalendarService.for_user(current_user, fallback=False)
                 except ValueError as e:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
@@ -163,7 +165,7 @@ async def update_calendar_preferences(
             else:
                 # Test with global calendar service
                 try:
-                    calendar_service = get_calendar_service()
+                    await AsyncCalendarService.shared()
                 except FileNotFoundError:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
@@ -183,68 +185,19 @@ async def update_calendar_preferences(
         if preferences.calendar_id is not None:
             setattr(current_user, 'calendar_id', preferences.calendar_id)
         
-        db.commit()
-        
-        # If enabling sync for the first time, sync all existing deadlines
-        synced_count = 0
-        errors = []
-        
+        # If enabling sync for the first time, sync existing deadlines in the background
+        sync_job = None
         if preferences.calendar_sync_enabled is True and not was_enabled:
-            logger.info(f"Calendar sync just enabled for user {current_user.id}. Syncing existing deadlines...")
-            
-            try:
-                # Get calendar service for the user
-                from services.calendar_service import get_calendar_service_for_user
-                try:
-                    calendar_service = get_calendar_service_for_user(current_user)
-                except ValueError:
-                    # Fall back to global service if user doesn't have OAuth tokens
-                    calendar_service = get_calendar_service()
-                
-                calendar_id = getattr(current_user, 'calendar_id', None) or "primary"
-                
-                # Get all unsynced deadlines for the user
-                from models.deadline import Deadline
-                unsynced_deadlines = db.query(Deadline).filter(
-                    Deadline.user_id == current_user.id,
-                    Deadline.calendar_synced == False,
-                    Deadline.completed == False
-                ).all()
-                
-                for deadline in unsynced_deadlines:
-                    try:
-                        # Create calendar event
-                        event = calendar_service.create_event(
-                            title=str(getattr(deadline, 'title')),
-                            description=str(getattr(deadline, 'description', '') or ''),
-                            start_datetime=getattr(deadline, 'date'),
-                            estimated_hours=getattr(deadline, 'estimated_hours', None),
-                            course=getattr(deadline, 'course', None),
-                            priority=str(getattr(deadline, 'priority')),
-                            calendar_id=calendar_id
-                        )
-                        
-                        # Update deadline with calendar event ID
-                        setattr(deadline, 'calendar_event_id', event.get('id'))
-                        setattr(deadline, 'calendar_synced', True)
-                        synced_count += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to sync deadline {deadline.id}: {e}")
-                        errors.append({
-                            "deadline_id": deadline.id,
-                            "title": deadline.title,
-                            "error": str(e)
-                        })
-                
-                db.commit()
-                logger.info(f"Synced {synced_count} existing deadlines for user {current_user.id}")
-                
-            except Exception as e:
-                logger.error(f"Failed to sync deadlines when enabling calendar: {e}")
-                # Don't fail the preference update, but log the error
+            logger.info(f"Calendar sync just enabled for user {current_user.id}. Queueing sync of existing deadlines...")
+            sync_job = await enqueue_job_async(
+                db,
+                "calendar.sync_user",
+                {"user_id": current_user.id, "calendar_id": getattr(current_user, 'calendar_id', None) or "primary"},
+                dedupe_key=f"calendar.sync_user:{current_user.id}"
+            )
         
-        db.refresh(current_user)
+        await db.commit()
+        await db.refresh(current_user)
         
         response = {
             "message": "Calendar preferences updated successfully",
@@ -252,20 +205,16 @@ async def update_calendar_preferences(
             "calendar_id": current_user.calendar_id or "primary"
         }
         
-        # Add sync results if deadlines were synced
         if preferences.calendar_sync_enabled is True and not was_enabled:
-            response["synced_count"] = synced_count
-            if synced_count > 0:
-                response["message"] += f" - {synced_count} existing deadlines synced to calendar"
-            if errors:
-                response["sync_errors"] = errors
+            response["message"] += " - existing deadlines are being synced to calendar"
+            response["sync_job_id"] = sync_job.id if sync_job else None
         
         return response
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Failed to update calendar preferences: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -276,8 +225,8 @@ async def update_calendar_preferences(
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db.delete(current_user)
-    db.commit()
+    await db.delete(current_user)
+    await db.commit()
     return
\ No newline at end of file
@@ -70,3 +70,44 @@ class DeadlineResponse(DeadlineBase):
     class Config:
         orm_mode = True
 
+
+class DeadlinePage(BaseModel):
+    items: List[DeadlineResponse]
+    next_cursor: Optional[str] = None  # Opaque; pass back as `cursor` to fetch the next page
+
+
+class DeadlineChanges(BaseModel):
+    changed: List[DeadlineResponse]  # Created or updated since the token
+    deleted: List[int]  # Ids of deadlines deleted since the token
+    next_token: str  # Pass back as `since` on the next poll
+    reset: bool = False  # True when `changed` is the full list and the client should replace its copy
+
+
+class BulkOperationType(str, Enum):
+    create = "create"
+    update = "update"
+    complete = "complete"
+    delete = "delete"
+
+
+class DeadlineBulkOperation(BaseModel):
+    op: BulkOperationType
+    id: Optional[int] = None  # Target deadline for update/complete/delete
+    deadline: Optional[DeadlineCreate] = None  # Required for create
+    changes: Optional[DeadlineUpdate] = None  # Required for update
+
+
+class DeadlineBulkRequest(BaseModel):
+    operations: List[DeadlineBulkOperation] = Field(..., min_length=1, max_length=500)
+
+
+class DeadlineBulkResult(BaseModel):
+    index: int  # Position in the request's operations list
+    op: BulkOperationType
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+
+
+class DeadlineBulkResponse(BaseModel):
+    results: List[DeadlineBulkResult]
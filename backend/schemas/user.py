@@ -2,6 +2,7 @@ from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, validator
 import re
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 class UserBase(BaseModel):
     email: EmailStr
@@ -27,6 +28,24 @@ class UserUpdate(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None
     is_active: Optional[bool] = None
+    timezone: Optional[str] = None
+    digest_hour: Optional[int] = None
+
+    @validator('timezone')
+    def timezone_validator(cls, v):
+        if v is None:
+            return v
+        try:
+            ZoneInfo(v)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError('Timezone must be a valid IANA timezone name, e.g. "Europe/London"')
+        return v
+
+    @validator('digest_hour')
+    def digest_hour_validator(cls, v):
+        if v is not None and not 0 <= v <= 23:
+            raise ValueError('Digest hour must be between 0 and 23')
+        return v
 
 class CalendarPreferencesUpdate(BaseModel):
     calendar_sync_enabled: Optional[bool] = None
@@ -38,6 +57,8 @@ class UserResponse(UserBase):
     is_verified: bool
     calendar_sync_enabled: bool = False
     calendar_id: Optional[str] = None
+    timezone: str = "UTC"
+    digest_hour: int = 8
     created_at: datetime
     updated_at: Optional[datetime] = None
 
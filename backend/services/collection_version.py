@@ -0,0 +1,59 @@
+"""
+Per-user and per-team deadline collection versions
+
+Every flush that inserts, changes or deletes a Deadline bumps
+users.deadlines_version (and teams.deadlines_version for the old and new team)
+in the same transaction, so the collection ETags served by routers/deadline.py
+change exactly when the serialized lists can. Registered on the Session class,
+so it covers the request path, the scheduler and the job worker alike.
+"""
+from typing import Set
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from models.deadline import Deadline
+from models.team import Team
+from models.user import User
+
+
+def _owner_ids(deadline: Deadline, attr: str) -> Set[int]:
+    """Current and previous values of a deadline's owner column"""
+    history = inspect(deadline).attrs[attr].history
+    return {value for value in (*history.added, *history.unchanged, *history.deleted) if value is not None}
+
+
+@event.listens_for(Session, "before_flush")
+def bump_deadline_collection_versions(session, flush_context, instances):
+    user_ids: Set[int] = set()
+    team_ids: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, Deadline):
+            user_ids |= _owner_ids(obj, "user_id")
+            team_ids |= _owner_ids(obj, "team_id")
+    for obj in session.dirty:
+        if isinstance(obj, Deadline) and session.is_modified(obj, include_collections=False):
+            user_ids |= _owner_ids(obj, "user_id")
+            team_ids |= _owner_ids(obj, "team_id")
+    for obj in session.deleted:
+        if isinstance(obj, Deadline):
+            user_ids |= _owner_ids(obj, "user_id")
+            team_ids |= _owner_ids(obj, "team_id")
+
+    # Core updates on the flush connection: no autoflush, and updated_at is left as is
+    connection = session.connection()
+    if user_ids:
+        users = User.__table__
+        connection.execute(
+            update(users)
+            .where(users.c.id.in_(user_ids))
+            .values(deadlines_version=users.c.deadlines_version + 1, updated_at=users.c.updated_at)
+        )
+    if team_ids:
+        teams = Team.__table__
+        connection.execute(
+            update(teams)
+            .where(teams.c.id.in_(team_ids))
+            .values(deadlines_version=teams.c.deadlines_version + 1)
+        )
@@ -1,12 +1,28 @@
-from typing import List
-import google.generativeai as genai
+from typing import Awaitable, Callable, List, Tuple
 from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 import json
 import asyncio
-import io
-from PyPDF2 import PdfReader
+import logging
+import re
+
+from core.config import settings
+from services.docx_extraction import DocxFormatError, DocxSource, extract_docx_text
+from services.extraction_cache import cache_key, get_extraction_cache
+from services.gemini_client import MODEL_NAME, get_gemini_client
+from services.pdf_extraction import PdfLimitError, PdfSource, iter_pdf_pages
+from services.prompt_budget import prepare_prompt_text
+from services.structured_extractor import pre_extract, structured_fields
+from services.text_chunking import PAGE_BREAK, split_into_chunks
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Part of the extraction cache key: bump when the prompt or response parsing changes
+PROMPT_VERSION = "document-v1"
+
 
 class ExtractedDeadline(BaseModel):
     title: str
@@ -15,30 +31,135 @@ class ExtractedDeadline(BaseModel):
     date: datetime
     priority: str
 
+
+ProgressCallback = Callable[[int, int, List[ExtractedDeadline]], Awaitable[None]]
+
+
+def dedupe_deadlines(deadlines: List[ExtractedDeadline]) -> List[ExtractedDeadline]:
+    """Drop repeats of the same (normalized title, date), e.g. from chunk overlap"""
+    seen = set()
+    unique = []
+    for deadline in deadlines:
+        key = (_NON_ALNUM.sub(" ", deadline.title.lower()).strip(), deadline.date)
+        if key not in seen:
+            seen.add(key)
+            unique.append(deadline)
+    return unique
+
+
 class DocumentProcessor:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
+    async def extract_text_from_pdf(self, pdf_source: PdfSource) -> str:
         """
-        Extract text content from PDF bytes
+        Extract text content from PDF bytes or a PDF file path, off the event loop
         """
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text.strip()
+            # Pages stream in from the process pool; page breaks are kept for the chunker
+            pages = [page async for page in iter_pdf_pages(pdf_source)]
+            return f"\n{PAGE_BREAK}".join(pages).strip()
+        except PdfLimitError:
+            raise
         except Exception as e:
             raise ValueError(f"Failed to extract text from PDF: {str(e)}")
     
-    async def extract_deadlines(self, document_text: str) -> List[ExtractedDeadline]:
+    async def extract_text_from_docx(self, docx_source: DocxSource) -> str:
+        """
+        Extract text content from DOCX bytes or a DOCX file path, off the event loop
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            return (await loop.run_in_executor(None, extract_docx_text, docx_source)).strip()
+        except DocxFormatError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Failed to extract text from DOCX: {str(e)}")
+    
+    async def extract_deadlines(
+        self,
+        document_text: str,
+        on_progress: Optional[ProgressCallback] = None,
+        cache_as: Optional[str] = None
+    ) -> List[ExtractedDeadline]:
+        """
+        Extract deadlines from document text
+
+        Structured lines and CSV rows are read locally first; only the residual text goes
+        to Gemini, and not at all when nothing deadline-like is left over.
+
+        Args:
+            on_progress: Awaited after each chunk with (chunks_done, chunks_total, deadlines so far)
+            cache_as: Extra cache key (e.g. digest_cache_key of the upload) for the final result,
+                stored only when every chunk succeeded
+        """
+        structured = pre_extract(document_text)
+        local = [ExtractedDeadline(**structured_fields(d)) for d in structured.deadlines]
+        if structured.is_complete:
+            logger.info(f"Extracted {len(local)} deadlines locally, skipping Gemini")
+            deadlines, complete = local, True
+        else:
+            llm_text = structured.residual_text if local else document_text
+            extracted, complete = await self._extract_with_llm(llm_text, local, on_progress)
+            deadlines = dedupe_deadlines(local + extracted)
+
+        if cache_as and complete and deadlines:
+            await get_extraction_cache().set(
+                cache_as, MODEL_NAME, PROMPT_VERSION, [d.model_dump(mode="json") for d in deadlines]
+            )
+        return deadlines
+
+    async def _extract_with_llm(
+        self,
+        document_text: str,
+        local: List[ExtractedDeadline],
+        on_progress: Optional[ProgressCallback]
+    ) -> Tuple[List[ExtractedDeadline], bool]:
+        """
+        Pre-filtered, chunked Gemini extraction, reusing the cached result for identical text
+
+        Returns:
+            (deadlines, complete); complete is False when any chunk failed
+        """
+        cache = get_extraction_cache()
+        key = cache_key(document_text, PROMPT_VERSION, MODEL_NAME)
+        cached = await cache.get(key)
+        if cached is not None:
+            return [ExtractedDeadline(**d) for d in cached], True
+
+        chunks = split_into_chunks(
+            prepare_prompt_text(document_text, label="document scan"),
+            settings.EXTRACTION_CHUNK_CHARS,
+            settings.EXTRACTION_CHUNK_OVERLAP_CHARS
+        )
+        semaphore = asyncio.Semaphore(settings.EXTRACTION_MAX_CONCURRENT_CHUNKS)
+        found: List[ExtractedDeadline] = list(local)
+        chunks_done = 0
+
+        async def extract_chunk(chunk: str) -> Optional[List[ExtractedDeadline]]:
+            nonlocal chunks_done
+            async with semaphore:
+                result = await self._extract_with_gemini(chunk)
+            chunks_done += 1
+            found.extend(result or [])
+            if on_progress is not None:
+                await on_progress(chunks_done, len(chunks), dedupe_deadlines(found))
+            return result
+
+        results = await asyncio.gather(*(extract_chunk(chunk) for chunk in chunks))
+        failed = sum(1 for result in results if result is None)
+        if failed == len(results):
+            return [], False
+        extracted = dedupe_deadlines([d for result in results if result for d in result])
+        if failed:
+            # Partial result: return what we have, but don't cache it
+            logger.warning(f"{failed} of {len(chunks)} chunks failed extraction")
+            return extracted, False
+        if extracted:
+            # An empty answer may be a transient Gemini failure; don't pin it for the whole TTL
+            await cache.set(key, MODEL_NAME, PROMPT_VERSION, [d.model_dump(mode="json") for d in extracted])
+        return extracted, True
+
+    async def _extract_with_gemini(self, document_text: str) -> Optional[List[ExtractedDeadline]]:
         """
-        Extract deadlines from document text using Gemini API
+        Extract deadlines from document text using Gemini API (None if the call or its JSON failed)
         """
         import logging
         logger = logging.getLogger(__name__)
@@ -67,11 +188,7 @@ class DocumentProcessor:
         """
         last_gemini_response = None
         try:
-            def generate_content():
-                response = self.model.generate_content(prompt)
-                return response.text
-            loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(None, generate_content)
+            content = await get_gemini_client().generate(prompt)
             last_gemini_response = content
             content = content.strip()
             if content.startswith('```json'):
@@ -84,7 +201,7 @@ class DocumentProcessor:
             except Exception as json_err:
                 logger.error(f"Gemini API returned invalid JSON: {content}")
                 logger.error(f"JSON parsing error: {json_err}")
-                return []
+                return None
             extracted = []
             for data in deadlines_data:
                 try:
@@ -107,4 +224,4 @@ class DocumentProcessor:
             logger.error(f"Error processing document with Gemini API: {str(e)}")
             if last_gemini_response:
                 logger.error(f"Last Gemini response: {last_gemini_response}")
-            return []
+            return None
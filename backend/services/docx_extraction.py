@@ -0,0 +1,119 @@
+"""
+Streaming text extraction for Word (DOCX) documents.
+
+Only `word/document.xml` is read from the zip container, through an
+incremental XML parser, so embedded images and other parts never reach
+memory. Paragraphs become lines; every table row becomes one line with its
+cells joined by " | " (course schedules usually live in tables, and a row
+keeps its title and date together for the structured pre-extractor). Explicit
+page breaks are kept as PAGE_BREAK for the chunker.
+"""
+import io
+import logging
+import zipfile
+from typing import Iterator, List, Union
+from xml.etree.ElementTree import iterparse
+
+from core.config import settings
+from services.text_chunking import PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+DocxSource = Union[bytes, str]  # DOCX bytes or a file path
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+CELL_SEPARATOR = " | "
+
+
+class DocxFormatError(ValueError):
+    """Not a DOCX container (e.g. a legacy binary .doc)"""
+
+
+def _open_archive(source: DocxSource) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+    except zipfile.BadZipFile:
+        raise DocxFormatError("Not a DOCX file. Legacy .doc files are not supported; save it as DOCX or PDF.")
+
+
+def iter_docx_lines(source: DocxSource) -> Iterator[str]:
+    """
+    Yield the paragraphs and table rows of a DOCX document in reading order
+
+    Raises:
+        DocxFormatError: If source is not a DOCX container
+        ValueError: If the text is longer than DOCX_MAX_TEXT_CHARS
+    """
+    with _open_archive(source) as archive:
+        try:
+            xml = archive.open("word/document.xml")
+        except KeyError:
+            raise DocxFormatError("DOCX file has no word/document.xml")
+
+        with xml:
+            body = None
+            paragraph: List[str] = []
+            rows: List[List[str]] = []  # Open table rows, innermost last
+            cells: List[List[str]] = []  # Lines of the open table cells, innermost last
+            page_break = False
+            total_chars = 0
+
+            def emit(line: str) -> Iterator[str]:
+                nonlocal page_break, total_chars
+                if cells:
+                    # Inside a table: the line becomes part of the enclosing cell
+                    cells[-1].append(line)
+                    return
+                total_chars += len(line)
+                if total_chars > settings.DOCX_MAX_TEXT_CHARS:
+                    raise ValueError(f"DOCX text is over the {settings.DOCX_MAX_TEXT_CHARS} character limit")
+                if page_break:
+                    line, page_break = PAGE_BREAK + line, False
+                yield line
+
+            for event, element in iterparse(xml, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    if tag == _W + "body":
+                        body = element
+                    elif tag == _W + "tr":
+                        rows.append([])
+                    elif tag == _W + "tc":
+                        cells.append([])
+                    continue
+
+                if tag == _W + "t":
+                    paragraph.append(element.text or "")
+                elif tag == _W + "tab":
+                    paragraph.append("\t")
+                elif tag in (_W + "br", _W + "cr"):
+                    if element.get(_W + "type") == "page" and not cells:
+                        text = "".join(paragraph).strip()
+                        paragraph = []
+                        if text:
+                            yield from emit(text)
+                        page_break = True
+                    else:
+                        paragraph.append("\n")
+                elif tag == _W + "p":
+                    text = "".join(paragraph).strip()
+                    paragraph = []
+                    if text:
+                        yield from emit(text)
+                elif tag == _W + "tc":
+                    lines = cells.pop()
+                    if rows:
+                        rows[-1].append(" ".join(" ".join(lines).split()))
+                elif tag == _W + "tr":
+                    row = rows.pop()
+                    if any(row):
+                        yield from emit(CELL_SEPARATOR.join(row))
+
+                if body is not None and tag in (_W + "p", _W + "tbl") and not cells:
+                    # Top-level block done: drop the parsed elements so memory stays flat
+                    body.clear()
+
+
+def extract_docx_text(source: DocxSource) -> str:
+    """Whole text of a DOCX document, one paragraph or table row per line"""
+    return "\n".join(iter_docx_lines(source))
@@ -0,0 +1,142 @@
+"""
+Concurrent email delivery through the Gmail API.
+
+`GmailService` wraps an httplib2 transport that is not thread-safe, so each
+delivery thread gets its own client. Messages are encoded up front, sent in
+parallel on a bounded pool, and paced to stay under the per-second quota.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from core.config import settings
+from services.gmail_service import GmailService, build_raw_message
+
+logger = logging.getLogger(__name__)
+
+
+class OutgoingEmail(BaseModel):
+    key: str  # Caller-defined identifier used to report per-message results
+    to_email: str
+    subject: str
+    text: str
+    html: Optional[str] = None
+
+
+class DeliveryReport(BaseModel):
+    sent: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+    messages_per_second: float = 0.0
+    sent_keys: List[str] = []
+    failures: Dict[str, str] = {}
+
+
+class _RatePacer:
+    """Hands out evenly spaced send slots so we never exceed `rate` sends per second"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class EmailDeliveryEngine:
+    def __init__(self, max_workers: int, rate_per_second: float):
+        self.max_workers = max_workers
+        self._pacer = _RatePacer(rate_per_second)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="email-delivery")
+
+    def _client(self) -> GmailService:
+        """Gmail client owned by the current pool thread"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = GmailService(settings.GMAIL_CREDENTIALS_PATH, settings.GMAIL_TOKEN_PATH)
+            self._local.client = client
+        return client
+
+    def _send_one(self, raw_message: str) -> dict:
+        self._pacer.wait()
+        return self._client().send_raw(raw_message)
+
+    def deliver(self, messages: List[OutgoingEmail]) -> DeliveryReport:
+        """
+        Send a batch of messages concurrently
+
+        Args:
+            messages: Messages to send; keys must be unique within the batch
+
+        Returns:
+            DeliveryReport with counts, throughput and per-key failures
+        """
+        report = DeliveryReport()
+        if not messages:
+            return report
+
+        started = time.monotonic()
+
+        # Encode every payload before touching the network
+        prepared = []
+        for message in messages:
+            try:
+                raw = build_raw_message(
+                    message.to_email, message.subject, message.text, message.html, settings.FROM_EMAIL
+                )
+                prepared.append((message.key, raw))
+            except Exception as e:
+                report.failures[message.key] = f"Failed to build message: {e}"
+
+        futures = {self._executor.submit(self._send_one, raw): key for key, raw in prepared}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                future.result()
+                report.sent_keys.append(key)
+            except Exception as e:
+                logger.error(f"Failed to deliver email {key}: {e}")
+                report.failures[key] = str(e)
+
+        report.sent = len(report.sent_keys)
+        report.failed = len(report.failures)
+        report.elapsed_seconds = round(time.monotonic() - started, 3)
+        if report.elapsed_seconds > 0:
+            report.messages_per_second = round(report.sent / report.elapsed_seconds, 2)
+
+        logger.info(
+            f"Delivered {report.sent}/{len(messages)} emails in {report.elapsed_seconds}s "
+            f"({report.messages_per_second} msg/s, {report.failed} failed)"
+        )
+        return report
+
+
+# Global instance (lazy initialization)
+_delivery_engine: Optional[EmailDeliveryEngine] = None
+_delivery_engine_lock = threading.Lock()
+
+
+def get_delivery_engine() -> EmailDeliveryEngine:
+    """Get or create the process-wide delivery engine"""
+    global _delivery_engine
+    with _delivery_engine_lock:
+        if _delivery_engine is None:
+            _delivery_engine = EmailDeliveryEngine(
+                max_workers=settings.EMAIL_MAX_WORKERS,
+                rate_per_second=settings.EMAIL_SEND_RATE_PER_SECOND
+            )
+    return _delivery_engine
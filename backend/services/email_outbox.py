@@ -0,0 +1,185 @@
+"""
+Durable email outbox.
+
+Producers (reminders, digests, test notifications) enqueue rendered messages in
+the same transaction as their ledger rows; the sender drains due rows with
+retry/backoff and dead-letters messages that keep failing.
+"""
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from models.email_outbox import EmailOutbox, OutboxStatus
+from models.notifications import Notification
+from services.email_delivery import OutgoingEmail, get_delivery_engine
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed row stays invisible to other senders
+OUTBOX_VISIBILITY_TIMEOUT = timedelta(minutes=5)
+# Backoff: 30s, 1m, 2m, 4m, ... capped at 1 hour
+OUTBOX_BACKOFF_BASE_SECONDS = 30
+OUTBOX_BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue_email(
+    db: Session,
+    idempotency_key: str,
+    email: OutgoingEmail,
+    user_id: Optional[int] = None,
+    notification: Optional[Notification] = None
+) -> Optional[EmailOutbox]:
+    """
+    Add a message to the outbox (caller commits)
+
+    Returns:
+        The outbox row, or None if a message with this idempotency key already exists
+    """
+    row = EmailOutbox(
+        idempotency_key=idempotency_key,
+        user_id=user_id,
+        notification=notification,
+        to_email=email.to_email,
+        subject=email.subject,
+        text_body=email.text,
+        html_body=email.html,
+        status=OutboxStatus.pending.value,
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc)
+    )
+    try:
+        with db.begin_nested():
+            db.add(row)
+            db.flush()
+    except IntegrityError:
+        logger.info(f"Email {idempotency_key} already queued, skipping")
+        return None
+    return row
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Exponential backoff with a little jitter"""
+    seconds = min(OUTBOX_BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), OUTBOX_BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.9, 1.1))
+
+
+class OutboxSender:
+    def __init__(self, batch_size: Optional[int] = None, max_attempts: Optional[int] = None):
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+
+    def _claim(self, db: Session, now: datetime):
+        """Mark a batch of due rows as in-flight so concurrent senders skip them"""
+        rows = db.query(EmailOutbox).filter(
+            or_(
+                and_(
+                    EmailOutbox.status == OutboxStatus.pending.value,
+                    EmailOutbox.next_attempt_at <= now
+                ),
+                and_(
+                    EmailOutbox.status == OutboxStatus.sending.value,
+                    EmailOutbox.locked_until < now
+                )
+            )
+        ).order_by(EmailOutbox.next_attempt_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        for row in rows:
+            row.status = OutboxStatus.sending.value
+            row.locked_until = now + OUTBOX_VISIBILITY_TIMEOUT
+        db.commit()
+        return rows
+
+    def drain_once(self) -> Dict[str, Any]:
+        """Claim and deliver one batch of due messages"""
+        stats: Dict[str, Any] = {
+            "claimed": 0, "sent": 0, "retried": 0, "dead": 0, "elapsed_seconds": 0.0, "messages_per_second": 0.0
+        }
+        # Claimed rows are used after the claim commit; expiring them would reload each one
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            now = datetime.now(timezone.utc)
+            rows = self._claim(db, now)
+            stats["claimed"] = len(rows)
+            if not rows:
+                return stats
+
+            report = get_delivery_engine().deliver([
+                OutgoingEmail(
+                    key=str(row.id),
+                    to_email=row.to_email,
+                    subject=row.subject,
+                    text=row.text_body,
+                    html=row.html_body
+                )
+                for row in rows
+            ])
+            stats["elapsed_seconds"] = report.elapsed_seconds
+            stats["messages_per_second"] = report.messages_per_second
+
+            finished_at = datetime.now(timezone.utc)
+            sent_keys = set(report.sent_keys)
+            notification_ids = []
+            for row in rows:
+                row.locked_until = None
+                if str(row.id) in sent_keys:
+                    row.status = OutboxStatus.sent.value
+                    row.sent_at = finished_at
+                    row.last_error = None
+                    if row.notification_id:
+                        notification_ids.append(row.notification_id)
+                    stats["sent"] += 1
+                    continue
+
+                row.attempts = (row.attempts or 0) + 1
+                row.last_error = report.failures.get(str(row.id), "Unknown delivery error")
+                if row.attempts >= self.max_attempts:
+                    row.status = OutboxStatus.dead.value
+                    stats["dead"] += 1
+                    logger.error(f"Email {row.idempotency_key} dead-lettered after {row.attempts} attempts: {row.last_error}")
+                else:
+                    row.status = OutboxStatus.pending.value
+                    row.next_attempt_at = finished_at + backoff_delay(row.attempts)
+                    stats["retried"] += 1
+
+            if notification_ids:
+                db.query(Notification).filter(Notification.id.in_(notification_ids)).update(
+                    {Notification.sent: True, Notification.sent_at: finished_at},
+                    synchronize_session=False
+                )
+            db.commit()
+            return stats
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error draining email outbox: {e}")
+            return stats
+        finally:
+            db.close()
+
+    def drain(self, should_continue: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Deliver batches until nothing is due
+
+        Args:
+            should_continue: Checked before every batch (e.g. a lease renewal); draining stops once it returns False
+        """
+        totals: Dict[str, Any] = {"claimed": 0, "sent": 0, "retried": 0, "dead": 0, "elapsed_seconds": 0.0}
+        while True:
+            if should_continue is not None and not should_continue():
+                logger.warning("Email outbox drain stopped: lease lost")
+                break
+            stats = self.drain_once()
+            for key in totals:
+                totals[key] += stats[key]
+            if stats["claimed"] < self.batch_size:
+                break
+        # Throughput over all batches, as reported per batch by the delivery engine
+        elapsed = totals["elapsed_seconds"]
+        totals["messages_per_second"] = round(totals["sent"] / elapsed, 2) if elapsed > 0 else 0.0
+        return totals
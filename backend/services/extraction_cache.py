@@ -0,0 +1,170 @@
+"""
+Content-addressed cache for Gemini deadline extraction results.
+
+Entries are keyed by a sha256 of the prompt version, model name and the
+whitespace-normalized input text, so the same syllabus or announcement is only
+sent to Gemini once; uploaded files are also keyed by the hash of their raw
+bytes, so a re-upload skips parsing too. Lookups hit an in-process TTL/LRU first and the
+`extraction_cache` table second; the hourly cleanup job drops expired rows and
+trims the table to EXTRACTION_CACHE_MAX_ROWS by last use. Cache failures are
+logged and treated as misses, never as scan failures.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from core.config import settings
+from db.database import AsyncSessionLocal
+from models.extraction_cache import ExtractionCacheEntry
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-extracted or re-pasted copies of a text hash alike"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(text: str, prompt_version: str, model_name: str) -> str:
+    digest = hashlib.sha256()
+    for part in (prompt_version, model_name, normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def digest_cache_key(content_sha256: str, content_type: str, prompt_version: str, model_name: str) -> str:
+    """Key for a whole uploaded file by the sha256 of its raw bytes, checked before it is parsed"""
+    return cache_key(f"{content_type}:sha256:{content_sha256}", f"{prompt_version}/file", model_name)
+
+
+class ExtractionCache:
+    def __init__(self, memory_entries: int, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._memory: TTLCache = TTLCache(maxsize=memory_entries, ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    async def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached extraction result (list of deadline dicts) or None"""
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached is not None:
+            self._count("memory_hits")
+            return cached
+
+        now = datetime.now(timezone.utc)
+        try:
+            async with AsyncSessionLocal() as db:
+                entry = await db.scalar(select(ExtractionCacheEntry).where(
+                    ExtractionCacheEntry.key == key,
+                    ExtractionCacheEntry.expires_at > now
+                ))
+                if entry is None:
+                    self._count("misses")
+                    return None
+                await db.execute(
+                    update(ExtractionCacheEntry)
+                    .where(ExtractionCacheEntry.key == key)
+                    .values(hits=ExtractionCacheEntry.hits + 1, last_used_at=now)
+                )
+                await db.commit()
+                result = json.loads(entry.result_json)
+        except Exception as e:
+            logger.warning(f"Extraction cache lookup failed: {e}")
+            self._count("errors")
+            return None
+
+        with self._lock:
+            self._memory[key] = result
+        self._count("db_hits")
+        return result
+
+    async def set(self, key: str, model_name: str, prompt_version: str, result: List[Dict[str, Any]]):
+        with self._lock:
+            self._memory[key] = result
+
+        now = datetime.now(timezone.utc)
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(ExtractionCacheEntry(
+                    key=key,
+                    model=model_name,
+                    prompt_version=prompt_version,
+                    result_json=json.dumps(result),
+                    last_used_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                await db.commit()
+        except IntegrityError:
+            # Another worker stored the same extraction first
+            pass
+        except Exception as e:
+            logger.warning(f"Extraction cache store failed: {e}")
+            self._count("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["db_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Global instance (lazy initialization)
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Get or create the process-wide extraction cache"""
+    global _extraction_cache
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = ExtractionCache(
+                memory_entries=settings.EXTRACTION_CACHE_MEMORY_ENTRIES,
+                ttl_seconds=settings.EXTRACTION_CACHE_TTL_SECONDS
+            )
+    return _extraction_cache
+
+
+def cleanup_extraction_cache():
+    """Delete expired cache rows and evict the least recently used beyond the size cap"""
+    from db.database import SessionLocal
+    db = SessionLocal()
+    try:
+        expired = db.query(ExtractionCacheEntry).filter(
+            ExtractionCacheEntry.expires_at < datetime.now(timezone.utc)
+        ).delete(synchronize_session=False)
+
+        cutoff = db.query(ExtractionCacheEntry.last_used_at).order_by(
+            ExtractionCacheEntry.last_used_at.desc()
+        ).offset(settings.EXTRACTION_CACHE_MAX_ROWS).limit(1).scalar()
+        evicted = 0
+        if cutoff is not None:
+            evicted = db.query(ExtractionCacheEntry).filter(
+                ExtractionCacheEntry.last_used_at <= cutoff
+            ).delete(synchronize_session=False)
+        db.commit()
+        if expired or evicted:
+            logger.info(f"Extraction cache cleanup: {expired} expired, {evicted} evicted")
+    except Exception as e:
+        logger.error(f"Error cleaning up extraction cache: {e}")
+        db.rollback()
+    finally:
+        db.close()
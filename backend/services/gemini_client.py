@@ -0,0 +1,134 @@
+"""
+Process-wide Gemini client shared by the document and text processors.
+
+Every generate call goes through, in order:
+- single-flight coalescing: identical prompts already in flight share one upstream call
+- a concurrency cap of GEMINI_MAX_CONCURRENT calls
+- a token bucket refilled at GEMINI_REQUESTS_PER_MINUTE with GEMINI_BURST capacity
+
+Limits apply per worker process. Queue depth and wait times are exposed
+through stats() on /api/metrics.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import google.generativeai as genai
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'gemini-2.5-flash'
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for and take one token (waiters are served in arrival order)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+
+class GeminiClient:
+    def __init__(self, api_key: str, model_name: str, requests_per_minute: int, burst: int, max_concurrent: int):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+        self._bucket = TokenBucket(requests_per_minute / 60, burst)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            "calls": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "queue_depth": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    async def generate(self, prompt: str) -> str:
+        """Response text for a prompt; raises whatever the upstream call raised"""
+        key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(self._call(prompt))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # Shielded so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here too, in case every caller was cancelled
+            self._stats["errors"] += 1
+
+    async def _call(self, prompt: str) -> str:
+        started = time.monotonic()
+        self._stats["queue_depth"] += 1
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._stats["queue_depth"])
+        queued = True
+        try:
+            async with self._semaphore:
+                await self._bucket.acquire()
+                waited = time.monotonic() - started
+                self._stats["queue_depth"] -= 1
+                queued = False
+                self._stats["calls"] += 1
+                self._stats["wait_seconds_total"] += waited
+                self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+                if waited > 1:
+                    logger.info(f"Gemini call waited {waited:.2f}s for rate limit / concurrency")
+
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, lambda: self.model.generate_content(prompt).text)
+        finally:
+            if queued:
+                self._stats["queue_depth"] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._in_flight)
+        stats["wait_seconds_avg"] = round(stats["wait_seconds_total"] / stats["calls"], 4) if stats["calls"] else 0.0
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        return stats
+
+
+# Global instance (lazy initialization)
+_gemini_client: Optional[GeminiClient] = None
+_gemini_client_lock = threading.Lock()
+
+
+def get_gemini_client() -> GeminiClient:
+    """Get or create the process-wide Gemini client"""
+    global _gemini_client
+    with _gemini_client_lock:
+        if _gemini_client is None:
+            _gemini_client = GeminiClient(
+                api_key=settings.GEMINI_API_KEY,
+                model_name=MODEL_NAME,
+                requests_per_minute=settings.GEMINI_REQUESTS_PER_MINUTE,
+                burst=settings.GEMINI_BURST,
+                max_concurrent=settings.GEMINI_MAX_CONCURRENT
+            )
+    return _gemini_client
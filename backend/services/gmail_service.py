@@ -21,6 +21,36 @@ logger = logging.getLogger(__name__)
 SCOPES = ['https://www.googleapis.com/auth/gmail.send']
 
 
+def build_raw_message(
+    to_email: str,
+    subject: str,
+    text: str,
+    html: Optional[str] = None,
+    from_email: Optional[str] = None
+) -> str:
+    """
+    Build a MIME message and encode it the way the Gmail API expects
+    
+    Returns:
+        str: base64url-encoded message for the `raw` field of messages.send
+    """
+    if html:
+        message = MIMEMultipart('alternative')
+        part1 = MIMEText(text, 'plain')
+        part2 = MIMEText(html, 'html')
+        message.attach(part1)
+        message.attach(part2)
+    else:
+        message = MIMEText(text, 'plain')
+    
+    message['To'] = to_email
+    message['Subject'] = subject
+    if from_email:
+        message['From'] = from_email
+    
+    return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+
+
 class GmailService:
     """Service for sending emails via Gmail API"""
     
@@ -90,6 +120,24 @@ class GmailService:
             logger.error(f"Failed to build Gmail service: {e}")
             raise
     
+    def send_raw(self, raw_message: str) -> dict:
+        """
+        Send an already-encoded message (see build_raw_message)
+        
+        Args:
+            raw_message: base64url-encoded RFC 2822 message
+        
+        Returns:
+            dict: Response from Gmail API with message details
+        """
+        if self.service is None:
+            raise RuntimeError("Gmail service not initialized. Call _authenticate() first.")
+        
+        return self.service.users().messages().send(
+            userId='me',
+            body={'raw': raw_message}
+        ).execute()
+    
     def send_email(
         self,
         to_email: str,
@@ -119,23 +167,7 @@ class GmailService:
             raise RuntimeError("Gmail service not initialized. Call _authenticate() first.")
         
         try:
-            # Create the email message
-            if html:
-                message = MIMEMultipart('alternative')
-                part1 = MIMEText(text, 'plain')
-                part2 = MIMEText(html, 'html')
-                message.attach(part1)
-                message.attach(part2)
-            else:
-                message = MIMEText(text, 'plain')
-            
-            message['To'] = to_email
-            message['Subject'] = subject
-            if from_email:
-                message['From'] = from_email
-            
-            # Encode the message
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+            raw_message = build_raw_message(to_email, subject, text, html, from_email)
             
             # Send the message
             sent_message = self.service.users().messages().send(
@@ -0,0 +1,136 @@
+"""
+Async facade over the synchronous Google API clients.
+
+`googleapiclient` and `google-auth` do blocking HTTP (including token refreshes),
+so async route handlers must never call them directly. Calls run on a dedicated,
+bounded thread pool with a per-call timeout; a slow Google response only ties up
+one pool thread instead of the event loop.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+from services.calendar_service import CalendarService, get_calendar_service, get_calendar_service_for_user
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleApiTimeoutError(TimeoutError):
+    pass
+
+
+class GoogleApiExecutor:
+    def __init__(self, max_workers: int, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google-api")
+
+    async def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a blocking Google call on the pool
+
+        Raises:
+            GoogleApiTimeoutError: If the call (including time queued) exceeds the timeout.
+                The pool thread finishes the call in the background.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        limit = timeout or self.timeout_seconds
+        try:
+            return await asyncio.wait_for(future, timeout=limit)
+        except asyncio.TimeoutError:
+            name = getattr(func, "__qualname__", repr(func))
+            logger.error(f"Google API call {name} timed out after {limit}s")
+            raise GoogleApiTimeoutError(f"Google API call timed out after {limit}s")
+
+
+# Global instance (lazy initialization)
+_google_executor: Optional[GoogleApiExecutor] = None
+_google_executor_lock = threading.Lock()
+
+
+def get_google_executor() -> GoogleApiExecutor:
+    """Get or create the process-wide Google API executor"""
+    global _google_executor
+    with _google_executor_lock:
+        if _google_executor is None:
+            _google_executor = GoogleApiExecutor(
+                max_workers=settings.GOOGLE_API_MAX_WORKERS,
+                timeout_seconds=settings.GOOGLE_API_TIMEOUT_SECONDS
+            )
+    return _google_executor
+
+
+async def run_google_call(func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """Run any blocking Google client call (OAuth exchange, token refresh, ...) off the event loop"""
+    return await get_google_executor().run(func, *args, timeout=timeout, **kwargs)
+
+
+# The global CalendarService shares one httplib2 transport, which is not thread-safe
+_shared_service_lock = threading.Lock()
+
+
+def _resolve_calendar_service(user, fallback: bool) -> "AsyncCalendarService":
+    """Build the user's client (may refresh the token) or fall back to the global one"""
+    if user is not None:
+        try:
+            return AsyncCalendarService(get_calendar_service_for_user(user))
+        except ValueError:
+            if not fallback:
+                raise
+    with _shared_service_lock:
+        return AsyncCalendarService(get_calendar_service(), lock=_shared_service_lock)
+
+
+class AsyncCalendarService:
+    """Awaitable wrapper around a CalendarService; every call runs on the Google pool"""
+
+    def __init__(self, service: CalendarService, lock: Optional[threading.Lock] = None):
+        self.service = service
+        self._lock = lock
+
+    @classmethod
+    async def for_user(cls, user, fallback: bool = True) -> "AsyncCalendarService":
+        """
+        Calendar client for a user's own Google account
+
+        Args:
+            user: User with stored OAuth tokens; a refreshed token is written back to it
+            fallback: Use the global calendar service if the user hasn't connected one
+
+        Raises:
+            ValueError: If the user hasn't connected their calendar and fallback is False
+        """
+        return await run_google_call(_resolve_calendar_service, user, fallback)
+
+    @classmethod
+    async def shared(cls) -> "AsyncCalendarService":
+        """Client for the global (server-configured) calendar"""
+        return await run_google_call(_resolve_calendar_service, None, True)
+
+    def _call(self, method: str, **kwargs) -> Any:
+        if self._lock is None:
+            return getattr(self.service, method)(**kwargs)
+        with self._lock:
+            return getattr(self.service, method)(**kwargs)
+
+    async def create_event(self, **kwargs) -> Dict[str, Any]:
+        return await run_google_call(self._call, "create_event", **kwargs)
+
+    async def update_event(self, **kwargs) -> Dict[str, Any]:
+        return await run_google_call(self._call, "update_event", **kwargs)
+
+    async def delete_event(self, **kwargs) -> bool:
+        return await run_google_call(self._call, "delete_event", **kwargs)
+
+    async def get_upcoming_events(
+        self,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        return await run_google_call(self._call, "get_upcoming_events", time_min=time_min, time_max=time_max, **kwargs)
@@ -0,0 +1,184 @@
+"""
+Handlers for background jobs (registered on import)
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from models.deadline import Deadline
+from models.user import User
+from services.calendar_service import get_calendar_service, get_calendar_service_for_user
+from services.job_queue import enqueue_job, job_handler, run_async
+
+logger = logging.getLogger(__name__)
+
+# Deadlines synced per calendar.sync_user job; the rest continue in a follow-up job
+CALENDAR_SYNC_BATCH_SIZE = 50
+
+
+def _calendar_service_for(user: User):
+    """User's own calendar if connected, otherwise the global service"""
+    try:
+        return get_calendar_service_for_user(user)
+    except ValueError:
+        return get_calendar_service()
+
+
+def _create_calendar_event(calendar_service, deadline: Deadline, calendar_id: str) -> Dict[str, Any]:
+    return calendar_service.create_event(
+        title=str(getattr(deadline, 'title')),
+        description=str(getattr(deadline, 'description', '') or ''),
+        start_datetime=getattr(deadline, 'date'),
+        estimated_hours=getattr(deadline, 'estimated_hours', None),
+        course=getattr(deadline, 'course', None),
+        priority=str(getattr(deadline, 'priority')),
+        calendar_id=calendar_id
+    )
+
+
+@job_handler("calendar.create_event")
+def create_calendar_event(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Create the Google Calendar event for one new deadline"""
+    deadline = db.query(Deadline).filter(Deadline.id == payload["deadline_id"]).first()
+    if not deadline or getattr(deadline, 'calendar_synced', False):
+        return {"skipped": True}
+
+    user = deadline.user
+    if not getattr(user, 'calendar_sync_enabled', False):
+        return {"skipped": True}
+
+    calendar_service = _calendar_service_for(user)
+    calendar_id = getattr(user, 'calendar_id', None) or "primary"
+    event = _create_calendar_event(calendar_service, deadline, calendar_id)
+
+    setattr(deadline, 'calendar_event_id', event.get('id'))
+    setattr(deadline, 'calendar_synced', True)
+    # Also persists a refreshed OAuth token
+    db.commit()
+    logger.info(f"Synced deadline {deadline.id} to user's calendar")
+    return {"event_id": event.get('id')}
+
+
+@job_handler("calendar.sync_user")
+def sync_user_calendar(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Create calendar events for a user's unsynced, incomplete deadlines"""
+    user = db.query(User).filter(User.id == payload["user_id"]).first()
+    if not user or not getattr(user, 'calendar_sync_enabled', False):
+        return {"skipped": True}
+
+    calendar_service = _calendar_service_for(user)
+    calendar_id = payload.get("calendar_id") or getattr(user, 'calendar_id', None) or "primary"
+    after_id = payload.get("after_id", 0)
+
+    unsynced_deadlines = db.query(Deadline).filter(
+        Deadline.user_id == user.id,
+        Deadline.calendar_synced == False,
+        Deadline.completed == False,
+        Deadline.id > after_id
+    ).order_by(Deadline.id).limit(CALENDAR_SYNC_BATCH_SIZE).all()
+
+    synced_count = 0
+    errors = []
+    for deadline in unsynced_deadlines:
+        try:
+            event = _create_calendar_event(calendar_service, deadline, str(calendar_id))
+            setattr(deadline, 'calendar_event_id', event.get('id'))
+            setattr(deadline, 'calendar_synced', True)
+            # Commit per event so a retried job never creates duplicates
+            db.commit()
+            synced_count += 1
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to sync deadline {deadline.id}: {e}")
+            errors.append({"deadline_id": deadline.id, "error": str(e)})
+
+    if len(unsynced_deadlines) == CALENDAR_SYNC_BATCH_SIZE:
+        # Failed rows stay behind after_id so the follow-up job does not loop on them
+        enqueue_job(db, "calendar.sync_user", {
+            "user_id": user.id,
+            "calendar_id": calendar_id,
+            "after_id": unsynced_deadlines[-1].id
+        })
+        db.commit()
+
+    logger.info(f"Synced {synced_count} existing deadlines for user {user.id}")
+    return {"synced_count": synced_count, "errors": errors}
+
+
+@job_handler("calendar.sync_deadlines")
+def sync_deadline_batch(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Apply the calendar side effects of one bulk deadline mutation"""
+    user = db.query(User).filter(User.id == payload["user_id"]).first()
+    if not user or not getattr(user, 'calendar_sync_enabled', False):
+        return {"skipped": True}
+
+    calendar_service = _calendar_service_for(user)
+    calendar_id = payload.get("calendar_id") or getattr(user, 'calendar_id', None) or "primary"
+    deadline_ids = set(payload.get("create", [])) | set(payload.get("update", []))
+    deadlines = {}
+    if deadline_ids:
+        deadlines = {
+            deadline.id: deadline
+            for deadline in db.query(Deadline).filter(
+                Deadline.user_id == user.id,
+                Deadline.id.in_(deadline_ids)
+            ).all()
+        }
+
+    errors = []
+    for deadline_id in payload.get("create", []):
+        deadline = deadlines.get(deadline_id)
+        if not deadline or getattr(deadline, 'calendar_synced', False):
+            continue
+        try:
+            event = _create_calendar_event(calendar_service, deadline, str(calendar_id))
+            setattr(deadline, 'calendar_event_id', event.get('id'))
+            setattr(deadline, 'calendar_synced', True)
+            # Commit per event so a retried job never creates duplicates
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to sync deadline {deadline_id}: {e}")
+            errors.append({"deadline_id": deadline_id, "error": str(e)})
+
+    for deadline_id in payload.get("update", []):
+        deadline = deadlines.get(deadline_id)
+        if not deadline or not getattr(deadline, 'calendar_event_id', None):
+            continue
+        try:
+            calendar_service.update_event(
+                event_id=str(getattr(deadline, 'calendar_event_id')),
+                title=str(getattr(deadline, 'title')),
+                description=str(getattr(deadline, 'description', '') or ''),
+                start_datetime=getattr(deadline, 'date'),
+                estimated_hours=getattr(deadline, 'estimated_hours', None),
+                course=getattr(deadline, 'course', None),
+                priority=str(getattr(deadline, 'priority')),
+                completed=getattr(deadline, 'completed', False),
+                calendar_id=str(calendar_id)
+            )
+        except Exception as e:
+            logger.error(f"Failed to update calendar event for deadline {deadline_id}: {e}")
+            errors.append({"deadline_id": deadline_id, "error": str(e)})
+
+    for event_id in payload.get("delete", []):
+        calendar_service.delete_event(event_id=event_id, calendar_id=str(calendar_id))
+
+    # Also persists a refreshed OAuth token
+    db.commit()
+    return {"errors": errors}
+
+
+@job_handler("scan.document")
+def run_document_scan(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Scan the document stored on a TempScan row; progress and results land in that row"""
+    from routers.deadline import run_scan_job
+    return run_async(run_scan_job(payload["temp_id"], "document"))
+
+
+@job_handler("scan.text")
+def run_text_scan(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Scan pasted text for a TempScan row"""
+    from routers.deadline import run_scan_job
+    return run_async(run_scan_job(payload["temp_id"], "text", text=payload["text"]))
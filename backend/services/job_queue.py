@@ -0,0 +1,306 @@
+"""
+Postgres-backed background job queue.
+
+Routers enqueue jobs in the same transaction as the rows they describe; workers
+(`python -m services.worker`, or the in-process worker) claim them with
+FOR UPDATE SKIP LOCKED, run the registered handler and retry failures with
+backoff. The claim is renewed while the handler runs; a job whose claim lapses
+(its worker died) is picked up again by another worker, and the old claimant's
+later status updates are ignored.
+"""
+import asyncio
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from models.job import Job, JobStatus
+from services.leader_lease import INSTANCE_ID
+
+logger = logging.getLogger(__name__)
+
+# Backoff: 10s, 20s, 40s, ... capped at 30 minutes
+JOB_BACKOFF_BASE_SECONDS = 10
+JOB_BACKOFF_MAX_SECONDS = 1800
+
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+# Loop that handlers run coroutines on: the API's loop for the in-process worker,
+# otherwise one started on first use
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_loop_lock = threading.Lock()
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails immediately"""
+
+
+def job_handler(kind: str):
+    """
+    Register a handler for a job kind
+
+    Handlers receive a fresh session and the decoded payload. They may commit
+    partial progress; the worker commits once more when marking the job done.
+    """
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def set_async_loop(loop: asyncio.AbstractEventLoop):
+    global _async_loop
+    with _async_loop_lock:
+        _async_loop = loop
+
+
+def run_async(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine from a (sync) job handler and wait for its result
+
+    All handlers share one event loop per process, so async engines, pools and
+    clients bound to a loop are reused instead of being rebuilt per job.
+    """
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None or _async_loop.is_closed():
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever, name="job-async-loop", daemon=True).start()
+        loop = _async_loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    run_at: Optional[datetime] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None
+) -> Optional[Job]:
+    """
+    Add a job to the queue (caller commits)
+
+    `dedupe_key` only collapses jobs that are still queued or running; it is
+    cleared when the job finishes so the same work can be requested again later.
+
+    Returns:
+        The job row, or None if an unfinished job with this dedupe key already exists
+    """
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        dedupe_key=dedupe_key,
+        status=JobStatus.queued.value,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=run_at or datetime.now(timezone.utc)
+    )
+    try:
+        with db.begin_nested():
+            db.add(job)
+            db.flush()
+    except IntegrityError:
+        logger.info(f"Job {dedupe_key} already queued, skipping")
+        return None
+    return job
+
+
+async def enqueue_job_async(db: AsyncSession, kind: str, payload: Optional[Dict[str, Any]] = None, **kwargs) -> Optional[Job]:
+    """`enqueue_job` for routers using an AsyncSession (caller commits)"""
+    return await db.run_sync(enqueue_job, kind, payload, **kwargs)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with a little jitter"""
+    seconds = min(JOB_BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), JOB_BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=seconds * random.uniform(0.9, 1.1))
+
+
+class JobWorker:
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        poll_seconds: Optional[float] = None,
+        worker_id: str = INSTANCE_ID
+    ):
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.JOB_POLL_SECONDS
+        self.visibility_timeout = timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lock one due job, mark it running and commit so other workers skip it"""
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            job = db.query(Job).filter(
+                or_(
+                    and_(Job.status == JobStatus.queued.value, Job.run_at <= now),
+                    and_(Job.status == JobStatus.running.value, Job.locked_until < now)
+                )
+            ).order_by(Job.run_at).limit(1).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                return None
+
+            if job.status == JobStatus.running.value:
+                logger.warning(f"Job {job.id} ({job.kind}) timed out on {job.locked_by}, reclaiming")
+            job.status = JobStatus.running.value
+            job.attempts = (job.attempts or 0) + 1
+            job.locked_until = now + self.visibility_timeout
+            job.locked_by = self.worker_id
+            claimed = {
+                "id": job.id,
+                "kind": job.kind,
+                "payload": json.loads(job.payload or "{}"),
+                "attempts": job.attempts,
+                "max_attempts": job.max_attempts
+            }
+            db.commit()
+            return claimed
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to claim job: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _owned(self, db: Session, claimed: Dict[str, Any]):
+        """Query for the job, matching only while this worker still holds the claim"""
+        return db.query(Job).filter(
+            Job.id == claimed["id"],
+            Job.status == JobStatus.running.value,
+            Job.locked_by == self.worker_id,
+            # Threads share worker_id; the attempt tells a reclaim apart
+            Job.attempts == claimed["attempts"]
+        )
+
+    def _heartbeat(self, claimed: Dict[str, Any], done: threading.Event):
+        """Push locked_until forward until done is set or the claim is lost"""
+        while not done.wait(self.visibility_timeout.total_seconds() / 3):
+            db = SessionLocal()
+            try:
+                count = self._owned(db, claimed).update(
+                    {Job.locked_until: datetime.now(timezone.utc) + self.visibility_timeout},
+                    synchronize_session=False
+                )
+                db.commit()
+                if count == 0:
+                    logger.warning(f"Job {claimed['id']} ({claimed['kind']}) is no longer claimed by {self.worker_id}")
+                    return
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to renew claim on job {claimed['id']}: {e}")
+            finally:
+                db.close()
+
+    def _execute(self, claimed: Dict[str, Any]):
+        job_id = claimed["id"]
+        kind = claimed["kind"]
+        handler = _handlers.get(kind)
+        done = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(claimed, done), name=f"job-heartbeat-{job_id}", daemon=True
+        ).start()
+        db = SessionLocal()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind {kind}")
+            result = handler(db, claimed["payload"])
+            done.set()
+            count = self._owned(db, claimed).update({
+                Job.status: JobStatus.succeeded.value,
+                Job.result: json.dumps(result) if result is not None else None,
+                Job.last_error: None,
+                Job.locked_until: None,
+                Job.dedupe_key: None,
+                Job.finished_at: datetime.now(timezone.utc)
+            }, synchronize_session=False)
+            db.commit()
+            if count == 0:
+                logger.warning(f"Job {job_id} ({kind}) finished after its claim was lost, result discarded")
+            else:
+                logger.info(f"Job {job_id} ({kind}) succeeded on attempt {claimed['attempts']}")
+        except Exception as e:
+            done.set()
+            db.rollback()
+            self._record_failure(db, claimed, e)
+        finally:
+            done.set()
+            db.close()
+
+    def _record_failure(self, db: Session, claimed: Dict[str, Any], error: Exception):
+        job_id = claimed["id"]
+        now = datetime.now(timezone.utc)
+        give_up = isinstance(error, PermanentJobError) or claimed["attempts"] >= claimed["max_attempts"]
+        values: Dict[Any, Any] = {Job.last_error: str(error), Job.locked_until: None}
+        if give_up:
+            values.update({
+                Job.status: JobStatus.failed.value,
+                Job.dedupe_key: None,
+                Job.finished_at: now
+            })
+            logger.error(f"Job {job_id} ({claimed['kind']}) failed after {claimed['attempts']} attempts: {error}")
+        else:
+            values.update({
+                Job.status: JobStatus.queued.value,
+                Job.run_at: now + retry_delay(claimed["attempts"])
+            })
+            logger.warning(f"Job {job_id} ({claimed['kind']}) attempt {claimed['attempts']} failed, retrying: {error}")
+        try:
+            count = self._owned(db, claimed).update(values, synchronize_session=False)
+            db.commit()
+            if count == 0:
+                logger.warning(f"Job {job_id} ({claimed['kind']}) failed after its claim was lost, not recorded")
+        except Exception as e:
+            db.rollback()
+            # The visibility timeout will hand the job to another worker
+            logger.error(f"Failed to record failure for job {job_id}: {e}")
+
+    def run_one(self) -> bool:
+        """Claim and run a single job; returns False if nothing was due"""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        self._execute(claimed)
+        return True
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if not self.run_one():
+                    self._stop.wait(self.poll_seconds)
+            except Exception as e:
+                logger.error(f"Error in job worker loop: {e}")
+                self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        """Start `concurrency` worker threads"""
+        self._stop.clear()
+        for index in range(self.concurrency):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} threads")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop claiming new jobs and wait for in-flight ones to finish"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Job worker {self.worker_id} stopped")
@@ -0,0 +1,102 @@
+"""
+Leader leases for background jobs.
+
+Every uvicorn worker and every instance starts the schedulers, so each job takes
+a lease row in `scheduler_state` before it runs. The holder renews the lease on
+every loop iteration (the heartbeat); if it dies, the lease expires and another
+process takes over on its next attempt.
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from db.database import SessionLocal
+from models.scheduler_state import SchedulerState
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in lease rows
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    def __init__(self, job_name: str, ttl_seconds: int, owner: str = INSTANCE_ID):
+        self.job_name = job_name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = owner
+        self.held = False
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; returns True if this process may run the job"""
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            result = db.execute(
+                update(SchedulerState)
+                .where(
+                    SchedulerState.name == self.job_name,
+                    or_(
+                        SchedulerState.lease_owner == self.owner,
+                        SchedulerState.lease_owner.is_(None),
+                        SchedulerState.lease_expires_at < now
+                    )
+                )
+                .values(lease_owner=self.owner, lease_expires_at=now + self.ttl)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                if db.get(SchedulerState, self.job_name) is not None:
+                    # Someone else holds a live lease
+                    db.rollback()
+                    self._set_held(False)
+                    return False
+                db.add(SchedulerState(name=self.job_name, lease_owner=self.owner, lease_expires_at=now + self.ttl))
+            db.commit()
+            self._set_held(True)
+            return True
+        except IntegrityError:
+            # Another process created the row first
+            db.rollback()
+            self._set_held(False)
+            return False
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to acquire lease {self.job_name}: {e}")
+            self._set_held(False)
+            return False
+        finally:
+            db.close()
+
+    def release(self):
+        """Give the lease up so another process can take over immediately"""
+        if not self.held:
+            return
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(SchedulerState)
+                .where(SchedulerState.name == self.job_name, SchedulerState.lease_owner == self.owner)
+                .values(lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            self.held = False
+            logger.info(f"Released lease {self.job_name}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to release lease {self.job_name}: {e}")
+        finally:
+            db.close()
+
+    def _set_held(self, held: bool):
+        if held != self.held:
+            if held:
+                logger.info(f"Acquired lease {self.job_name} as {self.owner}")
+            else:
+                logger.info(f"Lease {self.job_name} is held by another process")
+        self.held = held
@@ -1,22 +1,57 @@
 """
-Notification service for deadline reminders using Mailgun
+Notification service for deadline reminders (messages are delivered via the email outbox)
 """
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from itertools import groupby
+from datetime import datetime, timedelta, timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import List, Optional, Dict, Any, Set, Tuple
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import and_, or_, select
 
-from core.emails_utils import send_email
 from services.email_templates import EmailTemplates
+from services.email_delivery import OutgoingEmail
+from services.email_outbox import enqueue_email
 from models.user import User
 from models.deadline import Deadline
-from models.notifications import Notification
+from models.notifications import Notification, NotificationKind, NotificationChannel
+from models.scheduler_state import SchedulerState
 from db.database import SessionLocal
+from services.reminder_schedule import REMINDER_GRACE, as_utc, schedule_next_reminder
 
 logger = logging.getLogger(__name__)
 
 
+def resolve_timezone(name: Optional[str]) -> tzinfo:
+    """ZoneInfo for a stored timezone name, falling back to UTC"""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {name!r}, using UTC")
+        return timezone.utc
+
+# Max reminders loaded per query while draining due reminder pointers
+REMINDER_BATCH_SIZE = 200
+
+# Overdue sweep: watermark row name, stream batch size, and how far back a fresh install looks
+OVERDUE_SWEEP_JOB = "overdue_sweep"
+OVERDUE_BATCH_SIZE = 200
+OVERDUE_INITIAL_LOOKBACK = timedelta(days=1)
+
+# Daily digests: rows fetched per round trip, and digests queued per commit
+DIGEST_BATCH_ROWS = 1000
+DIGEST_COMMIT_EVERY = 500
+# Digest buckets per hour (one per 5-minute tick) and how many late hours still get a digest
+DIGEST_SHARDS = 12
+DIGEST_CATCH_UP_HOURS = 2
+
+PERIOD_LABELS = {
+    NotificationKind.three_days: "3 days",
+    NotificationKind.one_day: "1 day",
+    NotificationKind.one_hour: "1 hour",
+}
+
+
 class NotificationService:
     def __init__(self):
         self.email_templates = EmailTemplates()
@@ -25,8 +60,22 @@ class NotificationService:
         """Get database session"""
         return SessionLocal()
     
-    def send_deadline_notification(self, user: User, deadline: Deadline, notification_type: str = "approaching", time_label: Optional[str] = None) -> bool:
-        """Send email notification for a specific deadline"""
+    def queue_deadline_notification(
+        self,
+        db: Session,
+        user: User,
+        deadline: Deadline,
+        notification_type: str = "approaching",
+        time_label: Optional[str] = None,
+        kind: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> bool:
+        """
+        Render the email for a specific deadline and put it in the outbox (caller commits)
+        
+        When `kind` is given a ledger row is written in the same transaction, so the
+        reminder counts as handled even before the outbox sender delivers it.
+        """
         try:
             now = datetime.now(timezone.utc)
             
@@ -95,23 +144,72 @@ class NotificationService:
                 logger.error(f"Unknown notification type: {notification_type}")
                 return False
             
-            # Send email
-            send_email(
-                to_email=user_email,
-                subject=subject,
-                text=text_body,
-                html=html_body
-            )
+            # Ledger row and outbox row land together or not at all
+            with db.begin_nested():
+                notification = None
+                if kind is not None:
+                    if notification_type == "overdue":
+                        message = f"Overdue deadline notification sent for: {deadline_title}"
+                    else:
+                        message = f"Approaching deadline notification sent for: {deadline_title} ({kind})"
+                    notification = self._record_notification(
+                        db,
+                        user_id=int(user.id),
+                        deadline_id=deadline_id,
+                        kind=kind,
+                        message=message
+                    )
+                
+                enqueue_email(
+                    db,
+                    idempotency_key=idempotency_key or f"deadline:{deadline_id}:{kind}:{NotificationChannel.email.value}",
+                    email=OutgoingEmail(
+                        key=f"deadline:{deadline_id}",
+                        to_email=user_email,
+                        subject=subject,
+                        text=text_body,
+                        html=html_body
+                    ),
+                    user_id=int(user.id),
+                    notification=notification
+                )
             
-            logger.info(f"Sent {notification_type} notification to {user_email} for deadline: {deadline_title}")
+            logger.info(f"Queued {notification_type} notification to {user_email} for deadline: {deadline_title}")
             return True
             
         except Exception as e:
             # Safe error logging
             user_email_safe = getattr(user, 'email', 'unknown') if user else 'unknown'
-            logger.error(f"Failed to send notification to {user_email_safe}: {str(e)}")
+            logger.error(f"Failed to queue notification to {user_email_safe}: {str(e)}")
             return False
     
+    def _sent_notification_keys(self, db: Session, deadline_ids: List[int]) -> Set[Tuple[int, str]]:
+        """Return the (deadline_id, kind) pairs already in the delivery ledger, in one query"""
+        if not deadline_ids:
+            return set()
+        rows = db.query(Notification.deadline_id, Notification.kind).filter(
+            Notification.deadline_id.in_(deadline_ids),
+            Notification.channel == NotificationChannel.email.value
+        ).all()
+        return {(row.deadline_id, row.kind) for row in rows}
+    
+    def _record_notification(self, db: Session, user_id: int, kind: str, message: str,
+                             deadline_id: Optional[int] = None, period_key: Optional[str] = None) -> Notification:
+        """Add a ledger row for a queued notification; the outbox sender marks it sent (caller commits)"""
+        now = datetime.now(timezone.utc)
+        notification = Notification(
+            user_id=user_id,
+            deadline_id=deadline_id,
+            kind=kind,
+            channel=NotificationChannel.email.value,
+            period_key=period_key,
+            message=message,
+            sent=False,
+            created_at=now
+        )
+        db.add(notification)
+        return notification
+    
     def check_and_send_deadline_notifications(self) -> Dict[str, int]:
         """Check all deadlines and send appropriate notifications"""
         db = self.get_db()
@@ -124,135 +222,50 @@ class NotificationService:
         try:
             now = datetime.now(timezone.utc)
             
-            # Get approaching deadlines (within 3 days)
-            approaching_deadlines = db.query(Deadline).options(
-                joinedload(Deadline.user)
-            ).join(User).filter(
-                and_(
-                    Deadline.completed.is_(False),
-                    Deadline.date >= now,
-                    Deadline.date <= now + timedelta(days=3),
-                    User.is_active.is_(True)
-                )
-            ).all()
-            
-            # Find overdue deadlines (not completed)
-            overdue_deadlines = db.query(Deadline).options(
-                joinedload(Deadline.user)
-            ).join(User).filter(
-                and_(
-                    Deadline.completed.is_(False),
-                    Deadline.date < now,
-                    User.is_active.is_(True)
+            # Approaching reminders: only rows whose reminder pointer is due
+            failed_ids: List[int] = []
+            while True:
+                query = db.query(Deadline).options(
+                    joinedload(Deadline.user)
+                ).join(User).filter(
+                    and_(
+                        Deadline.completed.is_(False),
+                        Deadline.next_reminder_at.isnot(None),
+                        Deadline.next_reminder_at <= now,
+                        User.is_active.is_(True)
+                    )
                 )
-            ).all()
-            
-            # Send approaching deadline notifications
-            for deadline in approaching_deadlines:
-                # User should be loaded due to joinedload, but double-check
-                if deadline.user is None:
-                    deadline.user = db.query(User).filter(User.id == deadline.user_id).first()
-                
-                if deadline.user is None:
-                    logger.warning(f"User not found for deadline {deadline.id}")
-                    continue
-                
-                # Calculate time until deadline
-                time_until = deadline.date - now
-                hours_until = time_until.total_seconds() / 3600
-                
-                # Determine notification periods that should be sent
-                # We check if we're within a 10-minute window of each threshold
-                notification_periods = []
-                
-                # 3 days before (between 71.5 and 72.5 hours before)
-                if 71.5 <= hours_until <= 72.5:
-                    notification_periods.append("3_days")
-                
-                # 1 day before (between 23.5 and 24.5 hours before)
-                elif 23.5 <= hours_until <= 24.5:
-                    notification_periods.append("1_day")
-                
-                # 1 hour before (between 0.92 and 1.08 hours before - ~55 to 65 minutes)
-                elif 0.92 <= hours_until <= 1.08:
-                    notification_periods.append("1_hour")
-                
-                # If no specific threshold matched, skip this deadline
-                if not notification_periods:
-                    continue
+                if failed_ids:
+                    query = query.filter(~Deadline.id.in_(failed_ids))
+                due_deadlines = query.order_by(Deadline.next_reminder_at).limit(REMINDER_BATCH_SIZE).all()
                 
-                # Check each notification period
-                for notification_period in notification_periods:
-                    deadline_title_str = str(getattr(deadline, 'title', '') or '')
+                sent_keys = self._sent_notification_keys(db, [d.id for d in due_deadlines])
+                for deadline in due_deadlines:
+                    notification_period = NotificationKind(deadline.next_reminder_kind)
+                    stale = now - as_utc(deadline.next_reminder_at) > REMINDER_GRACE
                     
-                    # Check if we already sent this specific notification (ever, not just today)
-                    existing_notification = db.query(Notification).filter(
-                        and_(
-                            Notification.user_id == deadline.user_id,
-                            Notification.message.contains(deadline_title_str),
-                            Notification.message.contains(notification_period),
-                            Notification.sent.is_(True)
-                        )
-                    ).first()
+                    # Skip reminders we already sent or whose window passed while we were down
+                    if stale or (deadline.id, notification_period.value) in sent_keys:
+                        schedule_next_reminder(deadline, now=now, after_kind=notification_period.value)
+                        continue
                     
-                    if existing_notification is None:
-                        # Determine how long until deadline for email content
-                        if notification_period == "3_days":
-                            period_label = "3 days"
-                        elif notification_period == "1_day":
-                            period_label = "1 day"
-                        else:
-                            period_label = "1 hour"
-                        
-                        if self.send_deadline_notification(deadline.user, deadline, "approaching", period_label):
-                            # Log the notification with the period to enable deduplication
-                            notification = Notification(
-                                user_id=deadline.user_id,
-                                message=f"Approaching deadline notification sent for: {deadline_title_str} ({notification_period})",
-                                sent=True,
-                                created_at=datetime.now(timezone.utc)
-                            )
-                            db.add(notification)
-                            stats["approaching_sent"] += 1
-                            logger.info(f"Sent {period_label} notification for deadline: {deadline_title_str}")
-                        else:
-                            stats["errors"] += 1
-            
-            # Send overdue deadline notifications (only once ever)
-            for deadline in overdue_deadlines:
-                # User should be loaded due to joinedload, but double-check
-                if deadline.user is None:
-                    deadline.user = db.query(User).filter(User.id == deadline.user_id).first()
-                
-                if deadline.user is None:
-                    logger.warning(f"User not found for deadline {deadline.id}")
-                    continue
-                
-                deadline_title_str = str(getattr(deadline, 'title', '') or '')
-                
-                existing_overdue_notification = db.query(Notification).filter(
-                    and_(
-                        Notification.user_id == deadline.user_id,
-                        Notification.message.contains(f"Overdue deadline notification sent for: {deadline_title_str}"),
-                        Notification.sent.is_(True)  # Proper SQLAlchemy boolean check
-                    )
-                ).first()
-                
-                if existing_overdue_notification is None:
-                    if self.send_deadline_notification(deadline.user, deadline, "overdue"):
-                        # Log the notification
-                        notification = Notification(
-                            user_id=deadline.user_id,
-                            message=f"Overdue deadline notification sent for: {deadline_title_str}",
-                            sent=True,
-                            created_at=datetime.now(timezone.utc)
-                        )
-                        db.add(notification)
-                        stats["overdue_sent"] += 1
+                    period_label = PERIOD_LABELS[notification_period]
+                    
+                    if self.queue_deadline_notification(db, deadline.user, deadline, "approaching", period_label,
+                                                        kind=notification_period.value):
+                        schedule_next_reminder(deadline, now=now, after_kind=notification_period.value)
+                        stats["approaching_sent"] += 1
                     else:
+                        # Leave the pointer in place so the next tick retries within the grace window
+                        failed_ids.append(deadline.id)
                         stats["errors"] += 1
+                
+                db.commit()
+                if len(due_deadlines) < REMINDER_BATCH_SIZE:
+                    break
             
-            db.commit()
+            # Overdue notifications (only once ever), swept incrementally from the watermark
+            self._sweep_overdue_deadlines(now, stats)
             
             logger.info(f"Notification check completed. Stats: {stats}")
             return stats
@@ -265,6 +278,77 @@ class NotificationService:
         finally:
             db.close()
     
+    def _sweep_overdue_deadlines(self, now: datetime, stats: Dict[str, int]) -> None:
+        """
+        Send overdue notifications for deadlines that crossed their due time since the
+        last sweep. Rows are streamed with a server-side cursor in fixed-size batches and
+        the watermark is checkpointed after every batch, so a restart resumes where it left off.
+        """
+        read_db = self.get_db()
+        write_db = self.get_db()
+        try:
+            state = write_db.get(SchedulerState, OVERDUE_SWEEP_JOB)
+            if state is None:
+                state = SchedulerState(name=OVERDUE_SWEEP_JOB)
+                write_db.add(state)
+            watermark = as_utc(state.watermark) if state.watermark else now - OVERDUE_INITIAL_LOOKBACK
+            
+            # >= so rows sharing the checkpoint timestamp are revisited; the ledger dedups them
+            stmt = select(Deadline).join(User).options(
+                contains_eager(Deadline.user)
+            ).where(
+                Deadline.completed.is_(False),
+                Deadline.date >= watermark,
+                Deadline.date <= now,
+                User.is_active.is_(True)
+            ).order_by(Deadline.date, Deadline.id).execution_options(yield_per=OVERDUE_BATCH_SIZE)
+            
+            earliest_failure: Optional[datetime] = None
+            for batch in read_db.execute(stmt).scalars().partitions():
+                sent_keys = self._sent_notification_keys(write_db, [d.id for d in batch])
+                for deadline in batch:
+                    if (deadline.id, NotificationKind.overdue.value) in sent_keys:
+                        continue
+                    
+                    if self.queue_deadline_notification(write_db, deadline.user, deadline, "overdue",
+                                                        kind=NotificationKind.overdue.value):
+                        stats["overdue_sent"] += 1
+                    else:
+                        # Hold the watermark back so the next sweep retries this one
+                        if earliest_failure is None:
+                            earliest_failure = as_utc(deadline.date)
+                        stats["errors"] += 1
+                
+                state.watermark = earliest_failure or as_utc(batch[-1].date)
+                write_db.commit()
+            
+            state.watermark = earliest_failure or now
+            write_db.commit()
+        except Exception as e:
+            write_db.rollback()
+            logger.error(f"Error in overdue sweep: {str(e)}")
+            stats["errors"] += 1
+        finally:
+            read_db.close()
+            write_db.close()
+    
+    def _render_daily_digest(self, user_id: int, username: Optional[str], email: Optional[str],
+                             upcoming_data: List[Dict[str, Any]], overdue_data: List[Dict[str, Any]],
+                             now: datetime) -> OutgoingEmail:
+        """Render the digest email for one user"""
+        # Ensure user data is strings
+        user_name = str(username or 'User')
+        user_email = str(email or '')
+        
+        subject = f"📊 Daily Deadline Digest - {now.strftime('%B %d, %Y')}"
+        text_body = self.email_templates.daily_digest_text(
+            user_name=user_name,
+            upcoming_deadlines=upcoming_data,
+            overdue_deadlines=overdue_data
+        )
+        
+        return OutgoingEmail(key=str(user_id), to_email=user_email, subject=subject, text=text_body)
+    
     def send_daily_digest(self, user_id: int) -> bool:
         """Send daily digest to a specific user"""
         db = self.get_db()
@@ -273,107 +357,188 @@ class NotificationService:
             user = db.query(User).filter(User.id == user_id).first()
             if user is None or not getattr(user, 'is_active', False):
                 return False
+            local_now = datetime.now(resolve_timezone(user.timezone))
+        finally:
+            db.close()
+        
+        stats = self.queue_daily_digests(user_filter=User.id == user_id, local_now=local_now)
+        return stats["errors"] == 0
+    
+    def _queue_digest(self, db: Session, user_id: int, digest: OutgoingEmail, period_key: str) -> None:
+        """Write the digest ledger row and its outbox message together (caller commits)"""
+        with db.begin_nested():
+            notification = self._record_notification(
+                db,
+                user_id=user_id,
+                kind=NotificationKind.digest.value,
+                period_key=period_key,
+                message=f"Daily digest sent for {period_key}"
+            )
+            enqueue_email(
+                db,
+                idempotency_key=f"digest:{user_id}:{period_key}:{NotificationChannel.email.value}",
+                email=digest,
+                user_id=user_id,
+                notification=notification
+            )
+    
+    def queue_due_digests(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Queue digests for users whose local digest hour has arrived
+        
+        Each hour is split into DIGEST_SHARDS buckets; a user belongs to bucket
+        user_id % DIGEST_SHARDS, so the send load is spread across the hour instead
+        of landing in one minute. Buckets up to the current one are included, and
+        the previous DIGEST_CATCH_UP_HOURS hours are swept too, so missed ticks catch up
+        (the ledger keeps it to one digest per local day). A catch-up hour from before
+        local midnight is keyed on the previous day's date.
+        """
+        now = now or datetime.now(timezone.utc)
+        totals: Dict[str, Any] = {"digests_queued": 0, "errors": 0, "timezones": 0}
+        
+        db = self.get_db()
+        try:
+            timezone_names = [
+                row.timezone for row in db.query(User.timezone).filter(User.is_active.is_(True)).distinct()
+            ]
+        finally:
+            db.close()
+        
+        for timezone_name in timezone_names:
+            local_now = now.astimezone(resolve_timezone(timezone_name))
+            bucket = local_now.minute * DIGEST_SHARDS // 60
+            # Catch-up hours wrap past midnight; those before it belong to yesterday's digest
+            today_hours = []
+            yesterday_hours = []
+            yesterday_local = None
+            for hours_ago in range(1, DIGEST_CATCH_UP_HOURS + 1):
+                digest_local = local_now - timedelta(hours=hours_ago)
+                if digest_local.date() == local_now.date():
+                    today_hours.append(digest_local.hour)
+                else:
+                    yesterday_hours.append(digest_local.hour)
+                    yesterday_local = yesterday_local or digest_local
             
-            now = datetime.now(timezone.utc)
-            
-            # Check if digest was already sent today
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            today_date_str = now.strftime('%Y-%m-%d')
-            
-            logger.info(f"Checking for existing digest for user {user_id} on {today_date_str}")
-            
-            existing_digest = db.query(Notification).filter(
-                and_(
-                    Notification.user_id == user_id,
-                    Notification.message.contains(f"Daily digest sent for {today_date_str}"),
-                    Notification.created_at >= today_start,
-                    Notification.sent.is_(True)
-                )
-            ).first()
-            
-            if existing_digest is not None:
-                logger.info(f"Daily digest already sent to user {user_id} today at {existing_digest.created_at}")
-                return True  # Already sent, consider it a success
-            
-            logger.info(f"No existing digest found, will send new digest to user {user_id}")
-            
-            # Get upcoming deadlines (next 7 days)
-            upcoming_deadlines = db.query(Deadline).filter(
-                and_(
-                    Deadline.user_id == user_id,
-                    Deadline.completed.is_(False),  # Proper SQLAlchemy boolean check
-                    Deadline.date > now,
-                    Deadline.date <= now + timedelta(days=7)
-                )
-            ).order_by(Deadline.date).all()
+            batches = [(
+                or_(
+                    and_(
+                        User.digest_hour == local_now.hour,
+                        (User.id % DIGEST_SHARDS) <= bucket
+                    ),
+                    User.digest_hour.in_(today_hours)
+                ),
+                local_now
+            )]
+            if yesterday_hours:
+                batches.append((User.digest_hour.in_(yesterday_hours), yesterday_local))
             
-            # Get overdue deadlines
-            overdue_deadlines = db.query(Deadline).filter(
-                and_(
-                    Deadline.user_id == user_id,
-                    Deadline.completed.is_(False),  # Proper SQLAlchemy boolean check
-                    Deadline.date < now
+            for hour_filter, digest_local in batches:
+                stats = self.queue_daily_digests(
+                    user_filter=and_(User.timezone == timezone_name, hour_filter),
+                    local_now=digest_local
                 )
-            ).order_by(Deadline.date).all()
-            
-            if not upcoming_deadlines and not overdue_deadlines:
-                # No deadlines to report
-                return True
-            
-            # Prepare data for template
-            upcoming_data = []
-            for deadline in upcoming_deadlines:
-                upcoming_data.append({
-                    'title': str(getattr(deadline, 'title', '') or 'Untitled'),
-                    'date': getattr(deadline, 'date', now),
-                    'course': str(getattr(deadline, 'course', '') or 'General')
-                })
-            
-            overdue_data = []
-            for deadline in overdue_deadlines:
-                overdue_data.append({
-                    'title': str(getattr(deadline, 'title', '') or 'Untitled'),
-                    'date': getattr(deadline, 'date', now),
-                    'course': str(getattr(deadline, 'course', '') or 'General')
-                })
-            
-            # Ensure user data is strings
-            user_name = str(getattr(user, 'username', '') or 'User')
-            user_email = str(getattr(user, 'email', '') or '')
+                totals["digests_queued"] += stats["digests_queued"]
+                totals["errors"] += stats["errors"]
+            totals["timezones"] += 1
+        
+        return totals
+    
+    def queue_daily_digests(self, user_filter=None, local_now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Build digests for every matching active user and put them in the outbox
+        
+        Upcoming and overdue deadlines for all users come from one query ordered by
+        user_id, streamed in batches and grouped per user. Users with nothing to report
+        or whose digest is already in the ledger never show up in the result.
+        
+        Args:
+            user_filter: Optional extra SQL condition on User (e.g. a single user id)
+            local_now: Current time in the users' timezone; sets the digest's day
+        
+        Returns:
+            Stats with the number of digests queued and failures
+        """
+        read_db = self.get_db()
+        write_db = self.get_db()
+        stats: Dict[str, Any] = {
+            "digests_queued": 0,
+            "errors": 0
+        }
+        
+        try:
+            now = datetime.now(timezone.utc)
+            local_now = local_now or now
+            today_date_str = local_now.strftime('%Y-%m-%d')
             
-            # Send digest email
-            subject = f"📊 Daily Deadline Digest - {now.strftime('%B %d, %Y')}"
-            text_body = self.email_templates.daily_digest_text(
-                user_name=user_name,
-                upcoming_deadlines=upcoming_data,
-                overdue_deadlines=overdue_data
-            )
+            already_queued = select(Notification.id).where(
+                Notification.user_id == Deadline.user_id,
+                Notification.kind == NotificationKind.digest.value,
+                Notification.channel == NotificationChannel.email.value,
+                Notification.period_key == today_date_str
+            ).exists()
             
-            send_email(
-                to_email=user_email,
-                subject=subject,
-                text=text_body
+            stmt = select(
+                Deadline.user_id,
+                User.username,
+                User.email,
+                Deadline.title,
+                Deadline.date,
+                Deadline.course
+            ).join(User, User.id == Deadline.user_id).where(
+                User.is_active.is_(True),
+                Deadline.completed.is_(False),
+                Deadline.date <= now + timedelta(days=7),
+                ~already_queued
             )
+            if user_filter is not None:
+                stmt = stmt.where(user_filter)
+            stmt = stmt.order_by(Deadline.user_id, Deadline.date).execution_options(yield_per=DIGEST_BATCH_ROWS)
             
-            # Log the notification
-            notification = Notification(
-                user_id=user_id,
-                message=f"Daily digest sent for {now.strftime('%Y-%m-%d')}",
-                sent=True,
-                created_at=now
-            )
-            db.add(notification)
-            db.commit()
+            pending = 0
+            for user_id, rows in groupby(read_db.execute(stmt), key=lambda row: row.user_id):
+                upcoming_data = []
+                overdue_data = []
+                username = email = None
+                for row in rows:
+                    username, email = row.username, row.email
+                    entry = {
+                        'title': str(row.title or 'Untitled'),
+                        'date': row.date,
+                        'course': str(row.course or 'General')
+                    }
+                    if as_utc(row.date) > now:
+                        upcoming_data.append(entry)
+                    elif as_utc(row.date) < now:
+                        overdue_data.append(entry)
+                
+                if not upcoming_data and not overdue_data:
+                    continue
+                
+                try:
+                    digest = self._render_daily_digest(user_id, username, email, upcoming_data, overdue_data, local_now)
+                    self._queue_digest(write_db, int(user_id), digest, today_date_str)
+                    stats["digests_queued"] += 1
+                    pending += 1
+                except Exception as e:
+                    logger.error(f"Failed to queue daily digest for user {user_id}: {e}")
+                    stats["errors"] += 1
+                
+                if pending >= DIGEST_COMMIT_EVERY:
+                    write_db.commit()
+                    pending = 0
             
-            logger.info(f"Sent daily digest to {user_email}")
-            return True
+            write_db.commit()
+            logger.info(f"Queued {stats['digests_queued']} daily digests")
+            return stats
             
         except Exception as e:
-            db.rollback()
-            logger.error(f"Failed to send daily digest to user {user_id}: {str(e)}")
-            return False
+            write_db.rollback()
+            logger.error(f"Failed to queue daily digests: {str(e)}")
+            stats["errors"] += 1
+            return stats
         finally:
-            db.close()
+            read_db.close()
+            write_db.close()
 
 
 # Global instance - create it properly
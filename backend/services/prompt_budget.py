@@ -0,0 +1,107 @@
+"""
+Relevance pre-filter and token budget for extraction prompts.
+
+Most of a syllabus (grading policy, office hours, reading lists) has no dates,
+so before text is sent to Gemini only lines mentioning a date or a
+deadline-like word are kept, together with a few lines of context on each side
+and the document's opening lines (course name, term). If the result is still
+over EXTRACTION_TOKEN_BUDGET the context is narrowed, and as a last resort the
+text is truncated. Token counts use tiktoken as an estimator; Gemini's own
+tokenizer differs, but the ratios are what matter here.
+"""
+import functools
+import logging
+from typing import List
+
+from core.config import settings
+from services.structured_extractor import looks_deadline_related
+from services.text_chunking import PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+# Opening lines always kept: they usually name the course and term
+HEADER_LINES = 3
+GAP_MARKER = "..."
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _keep_relevant(lines: List[str], relevant: List[bool], context: int) -> str:
+    keep = [False] * len(lines)
+    header_seen = 0
+    for index, line in enumerate(lines):
+        if header_seen < HEADER_LINES and line.strip():
+            keep[index] = True
+            header_seen += 1
+        if relevant[index]:
+            for neighbour in range(max(0, index - context), min(len(lines), index + context + 1)):
+                keep[neighbour] = True
+
+    kept: List[str] = []
+    for index, line in enumerate(lines):
+        if keep[index]:
+            kept.append(line)
+            continue
+        # A dropped line that starts a page still leaves its page break for the chunker
+        marker = PAGE_BREAK + GAP_MARKER if PAGE_BREAK in line else GAP_MARKER
+        if kept and kept[-1] in (GAP_MARKER, PAGE_BREAK + GAP_MARKER):
+            if marker != GAP_MARKER:
+                kept[-1] = marker
+        elif kept:
+            kept.append(marker)
+    return "\n".join(kept).strip()
+
+
+def prepare_prompt_text(text: str, label: str = "scan") -> str:
+    """
+    Text to send to the LLM: relevant lines with context, within the token budget
+
+    Inputs under EXTRACTION_PREFILTER_MIN_TOKENS, or with no relevant line at all,
+    are only subject to the budget.
+    """
+    budget = settings.EXTRACTION_TOKEN_BUDGET
+    original_tokens = count_tokens(text)
+    result = text
+
+    if original_tokens >= settings.EXTRACTION_PREFILTER_MIN_TOKENS:
+        # split("\n") keeps page breaks inside lines for the chunker
+        lines = text.split("\n")
+        relevant = [looks_deadline_related(line) for line in lines]
+        if any(relevant):
+            for context in range(settings.EXTRACTION_PREFILTER_CONTEXT_LINES, -1, -1):
+                result = _keep_relevant(lines, relevant, context)
+                if count_tokens(result) <= budget:
+                    break
+
+    tokens = count_tokens(result)
+    if tokens > budget:
+        logger.warning(f"{label}: {tokens} tokens after pre-filter exceed budget {budget}, truncating")
+        result = _truncate_to_tokens(result, budget)
+        tokens = budget
+
+    if tokens < original_tokens:
+        reduction = 100 * (original_tokens - tokens) / original_tokens
+        logger.info(f"{label}: prompt text {original_tokens} -> {tokens} tokens ({reduction:.0f}% fewer)")
+    return result
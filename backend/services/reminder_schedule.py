@@ -0,0 +1,77 @@
+"""
+Reminder schedule for deadlines.
+
+Each incomplete deadline carries a `next_reminder_at`/`next_reminder_kind` pointer
+so the notification scheduler only has to look at rows whose reminder is due.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from models.notifications import NotificationKind
+
+# Reminders sent before a deadline, in firing order
+REMINDER_OFFSETS = [
+    (NotificationKind.three_days, timedelta(days=3)),
+    (NotificationKind.one_day, timedelta(days=1)),
+    (NotificationKind.one_hour, timedelta(hours=1)),
+]
+
+# How late a reminder may still go out (the old hour windows were ~±30 minutes)
+REMINDER_GRACE = timedelta(minutes=30)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def compute_next_reminder(
+    due_date: Optional[datetime],
+    now: Optional[datetime] = None,
+    completed: bool = False,
+    after_kind: Optional[str] = None
+) -> Tuple[Optional[datetime], Optional[str]]:
+    """
+    Find the next reminder for a deadline.
+
+    Args:
+        due_date: Deadline date
+        now: Reference time (defaults to current UTC time)
+        completed: Completed deadlines get no reminders
+        after_kind: Only consider reminders that come after this kind
+
+    Returns:
+        (fire_at, kind) or (None, None) when nothing is left to send
+    """
+    if completed or due_date is None:
+        return None, None
+
+    now = now or datetime.now(timezone.utc)
+    due_date = as_utc(due_date)
+
+    offsets = REMINDER_OFFSETS
+    if after_kind is not None:
+        kinds = [kind.value for kind, _ in REMINDER_OFFSETS]
+        if after_kind in kinds:
+            offsets = REMINDER_OFFSETS[kinds.index(after_kind) + 1:]
+
+    for kind, offset in offsets:
+        fire_at = due_date - offset
+        if fire_at >= now - REMINDER_GRACE and due_date > now:
+            return fire_at, kind.value
+
+    return None, None
+
+
+def schedule_next_reminder(deadline, now: Optional[datetime] = None, after_kind: Optional[str] = None) -> None:
+    """Set the reminder pointer on a Deadline instance (caller commits)"""
+    fire_at, kind = compute_next_reminder(
+        getattr(deadline, 'date', None),
+        now=now,
+        completed=bool(getattr(deadline, 'completed', False)),
+        after_kind=after_kind
+    )
+    setattr(deadline, 'next_reminder_at', fire_at)
+    setattr(deadline, 'next_reminder_kind', kind)
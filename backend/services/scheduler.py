@@ -1,12 +1,20 @@
 """
 Background task schedulers for deadline notifications and temp scan cleanup
+
+Every process starts these loops; each job only runs in the process holding its
+lease (see services/leader_lease.py), and the loop iteration renews it.
 """
 import asyncio
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 import threading
 
+from sqlalchemy import or_
+
+from core.config import settings
+from services.extraction_cache import cleanup_extraction_cache
+from services.leader_lease import LeaderLease
 from services.notification_service import get_notification_service
 
 logger = logging.getLogger(__name__)
@@ -20,6 +28,11 @@ class NotificationScheduler:
         self.thread: Optional[threading.Thread] = None
         self.last_deadline_check = None
         self.last_digest_check = None
+        self.last_digest_stats: Optional[dict] = None
+        self.outbox_thread: Optional[threading.Thread] = None
+        self.last_outbox_stats: Optional[dict] = None
+        self.reminder_lease = LeaderLease("deadline_reminders", settings.SCHEDULER_LEASE_TTL_SECONDS)
+        self.outbox_lease = LeaderLease("email_outbox", settings.SCHEDULER_LEASE_TTL_SECONDS)
     
     def start(self):
         if self.running:
@@ -28,12 +41,18 @@ class NotificationScheduler:
         self.running = True
         self.thread = threading.Thread(target=self._run_scheduler, daemon=True)
         self.thread.start()
+        # Email delivery runs on its own loop so slow Gmail calls never stretch a tick
+        self.outbox_thread = threading.Thread(target=self._run_outbox_sender, daemon=True)
+        self.outbox_thread.start()
         logger.info("Notification scheduler started")
     
     def stop(self):
         self.running = False
         if self.task and not self.task.done():
             self.task.cancel()
+        # Hand the jobs to another process right away instead of waiting for expiry
+        self.reminder_lease.release()
+        self.outbox_lease.release()
         logger.info("Notification scheduler stopped")
     
     def _run_scheduler(self):
@@ -46,10 +65,34 @@ class NotificationScheduler:
         finally:
             loop.close()
     
+    def _run_outbox_sender(self):
+        import time
+        from services.email_outbox import OutboxSender
+
+        sender = OutboxSender()
+        logger.info("Email outbox sender started")
+        while self.running:
+            try:
+                if not self.outbox_lease.acquire():
+                    time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+                    continue
+                # Renewed before every batch so a long backlog never outlives the lease
+                stats = sender.drain(should_continue=self.outbox_lease.acquire)
+                if stats["claimed"]:
+                    self.last_outbox_stats = stats
+                    logger.info(f"Email outbox stats: {stats}")
+            except Exception as e:
+                logger.error(f"Error in email outbox sender: {e}")
+            time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+    
     async def _scheduler_loop(self):
         logger.info("Notification scheduler loop started")
         while self.running:
             try:
+                # Renewing every minute doubles as the lease heartbeat
+                if not self.reminder_lease.acquire():
+                    await asyncio.sleep(60)
+                    continue
                 now = datetime.now()
                 current_minute = now.replace(second=0, microsecond=0)
                 # Every 5 minutes
@@ -59,9 +102,7 @@ class NotificationScheduler:
                     notification_service = get_notification_service()
                     stats = notification_service.check_and_send_deadline_notifications()
                     logger.info(f"Notification stats: {stats}")
-                # Daily digest at 8 AM
-                if now.hour == 8 and now.minute == 0 and self.last_digest_check != current_minute:
-                    logger.info(f"Running daily digest notifications at {now.strftime('%H:%M:%S')}")
+                    # Daily digests go out per user at their local digest hour, one bucket per tick
                     self.last_digest_check = current_minute
                     await self._send_daily_digests()
                 await asyncio.sleep(60)
@@ -71,24 +112,12 @@ class NotificationScheduler:
     
     async def _send_daily_digests(self):
         try:
-            from db.database import SessionLocal
-            from models.user import User
-            db = SessionLocal()
-            try:
-                active_users = db.query(User).filter(User.is_active.is_(True)).all()
-                notification_service = get_notification_service()
-                for user in active_users:
-                    try:
-                        user_id_raw = getattr(user, 'id', None)
-                        if user_id_raw is not None:
-                            user_id = int(user_id_raw)
-                            notification_service.send_daily_digest(user_id)
-                    except Exception as e:
-                        user_id_safe = getattr(user, 'id', 'unknown')
-                        logger.error(f"Failed to send daily digest to user {user_id_safe}: {e}")
-                logger.info(f"Sent daily digests to {len(active_users)} users")
-            finally:
-                db.close()
+            notification_service = get_notification_service()
+            loop = asyncio.get_event_loop()
+            stats = await loop.run_in_executor(None, notification_service.queue_due_digests)
+            self.last_digest_stats = stats
+            if stats["digests_queued"] or stats["errors"]:
+                logger.info(f"Daily digest stats: {stats}")
         except Exception as e:
             logger.error(f"Error sending daily digests: {e}")
 
@@ -100,11 +129,14 @@ def cleanup_expired_scans():
     """Delete expired temporary scans"""
     from db.database import SessionLocal
     from models.temp_scan import TempScan
+    from services.upload_spool import remove_staged_upload
     db = SessionLocal()
     try:
         expired = db.query(TempScan).filter(TempScan.expires_at < datetime.now(timezone.utc)).all()
         count = len(expired)
         for scan in expired:
+            if scan.upload_path:
+                remove_staged_upload(scan.upload_path)
             db.delete(scan)
         db.commit()
         if count > 0:
@@ -115,6 +147,58 @@ def cleanup_expired_scans():
     finally:
         db.close()
 
+def fail_stale_scans():
+    """Mark background scans that never finished (e.g. their job died) as failed so pollers stop waiting"""
+    from db.database import SessionLocal
+    from models.temp_scan import ScanStatus, TempScan
+    from services.upload_spool import remove_staged_upload
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=settings.SCAN_JOB_STALE_SECONDS)
+        # A running scan is only stale once nothing renews its claim any more
+        stale = db.query(TempScan).filter(
+            TempScan.status.in_([ScanStatus.pending.value, ScanStatus.running.value]),
+            TempScan.created_at < cutoff,
+            or_(TempScan.locked_until.is_(None), TempScan.locked_until < now)
+        ).with_for_update(skip_locked=True).all()
+        for scan in stale:
+            if scan.upload_path:
+                remove_staged_upload(scan.upload_path)
+            scan.status = ScanStatus.failed.value
+            scan.error = "Scan did not finish"
+            scan.upload_path = None
+            scan.locked_until = None
+        db.commit()
+        if stale:
+            logger.warning(f"Marked {len(stale)} stale background scans as failed")
+    except Exception as e:
+        logger.error(f"Error failing stale scans: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def cleanup_deadline_tombstones():
+    """Delete deadline tombstones older than the delta-sync retention window"""
+    from db.database import SessionLocal
+    from models.deadline_tombstone import DeadlineTombstone
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.DEADLINE_TOMBSTONE_RETENTION_DAYS)
+        count = db.query(DeadlineTombstone).filter(
+            DeadlineTombstone.deleted_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        if count > 0:
+            logger.info(f"Cleaned up {count} expired deadline tombstones")
+    except Exception as e:
+        logger.error(f"Error cleaning up deadline tombstones: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+cleanup_lease = LeaderLease("temp_scan_cleanup", settings.SCHEDULER_LEASE_TTL_SECONDS)
+
 def start_cleanup_scheduler():
     """Start the background scheduler for temp scan cleanup"""
     import schedule
@@ -122,8 +206,13 @@ def start_cleanup_scheduler():
 
     def run_scheduler():
         schedule.every().hour.do(cleanup_expired_scans)
+        schedule.every(5).minutes.do(fail_stale_scans)
+        schedule.every().hour.do(cleanup_deadline_tombstones)
+        schedule.every().hour.do(cleanup_extraction_cache)
         while True:
-            schedule.run_pending()
+            # Only the lease holder runs the hourly job; the check renews the lease
+            if cleanup_lease.acquire():
+                schedule.run_pending()
             time.sleep(60)
 
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
@@ -131,4 +220,5 @@ def start_cleanup_scheduler():
     logger.info("Temp scan cleanup scheduler started")
 
 def stop_cleanup_scheduler():
+    cleanup_lease.release()
     logger.info("Temp scan cleanup scheduler stopped (manual stop not implemented)")
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""
+Deterministic deadline pre-extraction for already-structured input.
+
+Runs before any Gemini call. A CSV with a title-like and a date-like header
+column is read row by row; free text is read line by line, and a line that
+carries a deadline word and exactly one unambiguous date next to a short title
+("HW3 due 2025-10-15 23:59") becomes a deadline with a confidence score. Lines it cannot
+read confidently are returned as residual text for the LLM. When nothing
+deadline-like is left over, callers skip the LLM entirely.
+"""
+import csv
+import io
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Matches below this confidence are handed to the LLM instead
+MIN_CONFIDENCE = 0.8
+
+_MONTHS = {
+    name: index
+    for index, names in enumerate((
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ), start=1)
+    for name in names
+}
+_MONTH = r"(?P<month>" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\.?"
+
+_ISO_DATE = re.compile(r"\b(?P<year>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})(?:[T ](?P<h>\d{1,2}):(?P<min>\d{2})(?::\d{2})?)?\b")
+_NUMERIC_DATE = re.compile(r"\b(?P<a>\d{1,2})[/.](?P<b>\d{1,2})[/.](?P<year>\d{4}|\d{2})\b")
+_MONTH_FIRST = re.compile(r"\b" + _MONTH + r"\s+(?P<d>\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(?P<year>\d{4}))?\b", re.IGNORECASE)
+_DAY_FIRST = re.compile(r"\b(?P<d>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + _MONTH + r"(?:,?\s+(?P<year>\d{4}))?\b", re.IGNORECASE)
+_TIME = re.compile(r"\b(?P<h>\d{1,2})(?::(?P<min>\d{2}))?\s*(?P<ampm>[ap]\.?m\.?)(?![a-z])|\b(?P<h24>\d{1,2}):(?P<min24>\d{2})\b", re.IGNORECASE)
+
+# Lines describing repetition or ranges need the LLM to expand them
+_RECURRENCE = re.compile(r"\b(every|each|weekly|daily|monthly|biweekly|until|through|thru|between)\b", re.IGNORECASE)
+_DEADLINE_WORDS = re.compile(
+    r"\b(due|deadline|submit|submission|exam|midterm|final|quiz|test|homework|hw|assignment|project|"
+    r"paper|essay|report|lab|presentation|tomorrow|today|tonight|next|week|monday|tuesday|wednesday|"
+    r"thursday|friday|saturday|sunday)\b",
+    re.IGNORECASE
+)
+_HIGH_PRIORITY = re.compile(r"\b(exam|midterm|final|project)\b", re.IGNORECASE)
+_CONNECTORS = re.compile(
+    r"^(?:[\s:;,\-–—|]*(?:(?:is\s+)?due|deadline|by|on|at)\b)*[\s:;,\-–—|]*"
+    r"|[\s:;,\-–—|(]*(?:\b(?:(?:is\s+)?due|deadline|by|on|at)[\s:;,\-–—|)]*)*$",
+    re.IGNORECASE
+)
+_BULLET = re.compile(r"^\s*(?:[-*•]+|\d+[.)])\s+")
+
+_TITLE_COLUMNS = ("title", "name", "assignment", "task", "item", "deliverable", "event", "subject")
+_DATE_COLUMNS = ("due date", "date", "due", "deadline", "due_date", "duedate")
+_TIME_COLUMNS = ("time", "due time", "due_time")
+_COURSE_COLUMNS = ("course", "class", "module", "course name")
+_DESCRIPTION_COLUMNS = ("description", "details", "notes")
+_PRIORITY_COLUMNS = ("priority",)
+
+
+@dataclass
+class StructuredResult:
+    deadlines: List[Dict[str, Any]] = field(default_factory=list)  # ExtractedDeadline fields + confidence, source
+    residual: List[str] = field(default_factory=list)  # Lines the LLM still has to read
+    unparsed_rows: int = 0  # Rows/lines that could not be read, or were read below MIN_CONFIDENCE
+
+    @property
+    def residual_text(self) -> str:
+        return "\n".join(self.residual)
+
+    @property
+    def is_complete(self) -> bool:
+        """True when no leftover line looks like it could hold a deadline"""
+        return bool(self.deadlines) and not self.unparsed_rows and not any(
+            looks_deadline_related(line) for line in self.residual
+        )
+
+
+def _resolve_year(month: int, day: int, today: date) -> Tuple[int, float]:
+    """Next occurrence of a year-less date, with the confidence penalty for guessing"""
+    candidate = date(today.year, month, day)
+    return (today.year if candidate >= today else today.year + 1), 0.85
+
+
+def _find_dates(line: str, today: Optional[date] = None) -> List[Tuple[datetime, float, Tuple[int, int]]]:
+    """All (date, confidence, span) found in a line; invalid calendar dates are skipped"""
+    today = today or date.today()
+    found = []
+    taken: List[Tuple[int, int]] = []
+
+    def add(value: Optional[datetime], confidence: float, span: Tuple[int, int]):
+        if value is None or any(span[0] < end and start < span[1] for start, end in taken):
+            return
+        taken.append(span)
+        found.append((value, confidence, span))
+
+    for match in _ISO_DATE.finditer(line):
+        try:
+            value = datetime(int(match["year"]), int(match["m"]), int(match["d"]))
+            if match["h"]:
+                value = value.replace(hour=int(match["h"]), minute=int(match["min"]))
+        except ValueError:
+            continue
+        add(value, 1.0, match.span())
+
+    for match in _NUMERIC_DATE.finditer(line):
+        a, b = int(match["a"]), int(match["b"])
+        year = int(match["year"])
+        year += 2000 if year < 100 else 0
+        # Only read locally when one number can only be a day; "3/4/2025" is left to the LLM
+        month, day, confidence = (b, a, 0.9) if a > 12 else (a, b, 0.9 if b > 12 else 0.6)
+        try:
+            add(datetime(year, month, day), confidence, match.span())
+        except ValueError:
+            continue
+
+    for pattern in (_MONTH_FIRST, _DAY_FIRST):
+        for match in pattern.finditer(line):
+            month = _MONTHS[match["month"].lower()]
+            day = int(match["d"])
+            try:
+                if match["year"]:
+                    year, confidence = int(match["year"]), 0.95
+                else:
+                    year, confidence = _resolve_year(month, day, today)
+                add(datetime(year, month, day), confidence, match.span())
+            except ValueError:
+                continue
+
+    return found
+
+
+def _find_time(line: str) -> Optional[Tuple[time, Tuple[int, int]]]:
+    for match in _TIME.finditer(line):
+        if match["ampm"]:
+            hour = int(match["h"]) % 12 + (12 if match["ampm"].lower().startswith("p") else 0)
+            minute = int(match["min"] or 0)
+        else:
+            hour, minute = int(match["h24"]), int(match["min24"])
+        if hour < 24 and minute < 60:
+            return time(hour, minute), match.span()
+    return None
+
+
+def _deadline(title: str, when: datetime, confidence: float, source: str, description: str = "",
+              course: Optional[str] = None, priority: Optional[str] = None) -> Dict[str, Any]:
+    priority = (priority or "").strip().lower()
+    if priority not in ("high", "medium", "low"):
+        priority = "high" if _HIGH_PRIORITY.search(title) else "medium"
+    return {
+        "title": title,
+        "description": description,
+        "course": course or None,
+        "date": when,
+        "priority": priority,
+        "confidence": round(confidence, 2),
+        "source": source,  # Original line or row, handed to the LLM if the match is not confident
+    }
+
+
+def looks_deadline_related(line: str) -> bool:
+    """True if a line mentions a date or a deadline-like word"""
+    return bool(_DEADLINE_WORDS.search(line) or _find_dates(line))
+
+
+def structured_fields(deadline: Dict[str, Any]) -> Dict[str, Any]:
+    """A pre-extracted deadline without its confidence and source, ready for ExtractedDeadline(**...)"""
+    return {key: value for key, value in deadline.items() if key not in ("confidence", "source")}
+
+
+def parse_line(line: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    A deadline read from a single line, or None
+
+    Only lines with a deadline word qualify: "Classes begin Sept 3" or "last updated
+    2025-08-20" carry a clean date but are for the LLM to judge.
+    """
+    if _RECURRENCE.search(line) or not _DEADLINE_WORDS.search(line):
+        return None
+    dates = _find_dates(line, today)
+    if len(dates) != 1:
+        return None
+    when, confidence, span = dates[0]
+
+    spans = [span]
+    if not (when.hour or when.minute):
+        found_time = _find_time(line[:span[0]] + " " * (span[1] - span[0]) + line[span[1]:])
+        if found_time:
+            when = datetime.combine(when.date(), found_time[0])
+            spans.append(found_time[1])
+        else:
+            when = when.replace(hour=23, minute=59)
+
+    title = line
+    for start, end in sorted(spans, reverse=True):
+        title = title[:start] + " " + title[end:]
+    title = _BULLET.sub("", title)
+    title = re.sub(r"\s+", " ", _CONNECTORS.sub("", title.strip())).strip(" :;,-–—|()")
+    if len(title) < 2 or len(title) > 120:
+        return None
+    return _deadline(title, when, confidence, source=line, description=line.strip())
+
+
+def _column(header: List[str], names: Tuple[str, ...]) -> Optional[int]:
+    normalized = [name.strip().lower() for name in header]
+    for name in names:
+        if name in normalized:
+            return normalized.index(name)
+    return None
+
+
+def extract_from_csv(text: str, today: Optional[date] = None) -> Optional[StructuredResult]:
+    """Rows of a CSV with recognizable title and date columns, or None if it isn't one"""
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        if not csv.Sniffer().has_header(sample):
+            return None
+    except csv.Error:
+        return None
+
+    rows = list(csv.reader(io.StringIO(text), dialect))
+    if len(rows) < 2:
+        return None
+    header = rows[0]
+    title_col = _column(header, _TITLE_COLUMNS)
+    date_col = _column(header, _DATE_COLUMNS)
+    if title_col is None or date_col is None:
+        return None
+    time_col = _column(header, _TIME_COLUMNS)
+    course_col = _column(header, _COURSE_COLUMNS)
+    description_col = _column(header, _DESCRIPTION_COLUMNS)
+    priority_col = _column(header, _PRIORITY_COLUMNS)
+
+    def cell(row: List[str], index: Optional[int]) -> str:
+        return row[index].strip() if index is not None and index < len(row) else ""
+
+    result = StructuredResult()
+    for row in rows[1:]:
+        if not any(value.strip() for value in row):
+            continue
+        source = ", ".join(f"{name}: {value}" for name, value in zip(header, row))
+        title = cell(row, title_col)
+        date_text = cell(row, date_col)
+        time_text = cell(row, time_col)
+        dates = _find_dates(date_text, today)
+        if not title or len(dates) != 1:
+            result.residual.append(source)
+            result.unparsed_rows += 1
+            continue
+        when, confidence, _ = dates[0]
+        found_time = _find_time(time_text or date_text[dates[0][2][1]:])
+        if found_time:
+            when = datetime.combine(when.date(), found_time[0])
+        elif not (when.hour or when.minute):
+            when = when.replace(hour=23, minute=59)
+        result.deadlines.append(_deadline(
+            title,
+            when,
+            confidence,
+            source=source,
+            description=cell(row, description_col),
+            course=cell(row, course_col),
+            priority=cell(row, priority_col)
+        ))
+    return result
+
+
+def pre_extract(text: str, today: Optional[date] = None) -> StructuredResult:
+    """
+    Deadlines that can be read without the LLM, plus the residual lines it still needs
+
+    Matches below MIN_CONFIDENCE are left in the residual.
+    """
+    result = extract_from_csv(text, today)
+    if result is None:
+        result = StructuredResult()
+        # split("\n") rather than splitlines(): page breaks stay in the residual for the chunker
+        for line in text.split("\n"):
+            if not line.strip():
+                continue
+            parsed = parse_line(line, today)
+            if parsed is None:
+                result.residual.append(line)
+            else:
+                result.deadlines.append(parsed)
+
+    confident = []
+    for deadline in result.deadlines:
+        if deadline["confidence"] >= MIN_CONFIDENCE:
+            confident.append(deadline)
+        else:
+            # The whole original row goes to the LLM, and the result can no longer be complete
+            result.residual.append(deadline["source"])
+            result.unparsed_rows += 1
+    result.deadlines = confident
+    if confident:
+        logger.info(
+            f"Pre-extracted {len(confident)} deadlines locally, "
+            f"{len(result.residual)} residual lines, complete={result.is_complete}"
+        )
+    return result
@@ -0,0 +1,67 @@
+"""
+Split long document text into overlapping chunks for parallel LLM extraction.
+
+Chunks are packed from whole pages (separated by PAGE_BREAK), then paragraphs,
+then lines; only a single line longer than the chunk size is cut mid-text. Each
+chunk after the first starts with the tail of the previous one so a deadline
+straddling a boundary is seen whole by at least one prompt.
+"""
+import re
+from typing import List
+
+# Written between pages by the PDF and DOCX text extractors
+PAGE_BREAK = "\f"
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _split_unit(unit: str, max_chars: int) -> List[str]:
+    """Break an oversized page into paragraphs, then lines, then fixed-size pieces"""
+    if len(unit) <= max_chars:
+        return [unit]
+    for separator in (_PARAGRAPH_BREAK, re.compile(r"\n")):
+        parts = [part for part in separator.split(unit) if part.strip()]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _split_unit(part, max_chars)]
+    return [unit[i:i + max_chars] for i in range(0, len(unit), max_chars)]
+
+
+def _tail(text: str, overlap_chars: int) -> str:
+    """Last overlap_chars of text, starting at a line boundary when there is one"""
+    if overlap_chars <= 0 or not text:
+        return ""
+    tail = text[-overlap_chars:]
+    newline = tail.find("\n")
+    return tail[newline + 1:] if 0 <= newline < len(tail) - 1 else tail
+
+
+def split_into_chunks(text: str, max_chars: int, overlap_chars: int = 0) -> List[str]:
+    """
+    Pack text into chunks of at most about max_chars (+ overlap_chars of carried context)
+
+    Returns:
+        [text] unchanged when it already fits
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    units = [
+        piece
+        for page in text.split(PAGE_BREAK) if page.strip()
+        for piece in _split_unit(page.strip(), max_chars)
+    ]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+    for unit in units:
+        if current and current_len + len(unit) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            carried = _tail(chunks[-1], overlap_chars)
+            current = [carried] if carried else []
+            current_len = len(carried)
+        current.append(unit)
+        current_len += len(unit) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -1,11 +1,22 @@
 from typing import List
 from typing import Optional
 import json
-from datetime import datetime
+from datetime import date, datetime
 import io
-import google.generativeai as genai
 from pydantic import BaseModel
 import asyncio
+import logging
+
+from services.extraction_cache import cache_key, get_extraction_cache
+from services.gemini_client import MODEL_NAME, get_gemini_client
+from services.prompt_budget import prepare_prompt_text
+from services.structured_extractor import pre_extract, structured_fields
+
+logger = logging.getLogger(__name__)
+
+
+# Part of the extraction cache key: bump when the prompt or response parsing changes
+PROMPT_VERSION = "text-v1"
 
 
 class ExtractedDeadline(BaseModel):
@@ -17,15 +28,41 @@ class ExtractedDeadline(BaseModel):
 
 
 class TextProcessor:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model= genai.GenerativeModel('gemini-2.5-flash')
-
     async def extract_deadlines(self, document_text: str) -> List[ExtractedDeadline]:
         """
-        Extract deadlines from the user-entered text to generate deadlines
+        Extract deadlines from the user-entered text
+
+        Structured lines are read locally first; Gemini only sees the residual text (and
+        nothing when no deadline-like line is left), with results cached by content.
         """
         document_text = document_text.strip()
+        structured = pre_extract(document_text)
+        local = [ExtractedDeadline(**structured_fields(d)) for d in structured.deadlines]
+        if structured.is_complete:
+            logger.info(f"Extracted {len(local)} deadlines locally, skipping Gemini")
+            return local
+        if local:
+            # Only the lines the local pass could not read go to Gemini
+            document_text = structured.residual_text
+        # Relative phrases ("every Tuesday this month") resolve against today, so the day is part of the key
+        prompt_version = f"{PROMPT_VERSION}:{date.today().isoformat()}"
+        cache = get_extraction_cache()
+        key = cache_key(document_text, prompt_version, MODEL_NAME)
+        cached = await cache.get(key)
+        if cached is not None:
+            return local + [ExtractedDeadline(**d) for d in cached]
+
+        extracted = await self._extract_with_gemini(prepare_prompt_text(document_text, label="text scan"))
+        if not extracted:
+            # None is a failed call; an empty answer may be transient too, so neither is cached
+            return local
+        await cache.set(key, MODEL_NAME, prompt_version, [d.model_dump(mode="json") for d in extracted])
+        return local + extracted
+
+    async def _extract_with_gemini(self, document_text: str) -> Optional[List[ExtractedDeadline]]:
+        """
+        Extract deadlines from the user-entered text using Gemini API (None if the call or its JSON failed)
+        """
         import logging
         logger = logging.getLogger(__name__)
         prompt = f"""
@@ -56,11 +93,7 @@ class TextProcessor:
         """
         last_gemini_response = None
         try:
-            def generate_content():
-                response = self.model.generate_content(prompt)
-                return response.text
-            loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(None, generate_content)
+            content = await get_gemini_client().generate(prompt)
             last_gemini_response = content
             content = content.strip()
             if content.startswith('```json'):
@@ -73,7 +106,7 @@ class TextProcessor:
             except Exception as json_err:
                 logger.error(f"Gemini API returned invalid JSON: {content}")
                 logger.error(f"JSON parsing error: {json_err}")
-                return []
+                return None
             extracted = []
             for data in deadlines_data:
                 try:
@@ -96,4 +129,4 @@ class TextProcessor:
             logger.error(f"Error processing the entered text: {str(e)}")
             if last_gemini_response:
                 logger.error(f"Last Gemini respone: {last_gemini_response}")
-            return []
+            return None
@@ -0,0 +1,147 @@
+"""
+Size-capped, hashed spooling of uploaded documents.
+
+Uploads are copied in UPLOAD_CHUNK_BYTES pieces: small ones stay in memory,
+anything past UPLOAD_SPOOL_MEMORY_BYTES moves to a temp file on disk, and the
+copy stops with UploadTooLargeError once UPLOAD_MAX_BYTES is exceeded. The
+sha256 of the raw bytes is computed along the way so the extraction cache can
+be checked before the document is parsed at all. Background scans move the
+spooled file into SCAN_UPLOAD_DIR, and their job takes it over by path.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from fastapi import UploadFile
+
+from core.config import settings
+from services.pdf_extraction import PdfSource
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLargeError(ValueError):
+    """The upload exceeds UPLOAD_MAX_BYTES"""
+
+
+class SpooledUpload:
+    def __init__(self, memory_limit: int, suffix: str = ""):
+        self.size = 0
+        self._memory_limit = memory_limit
+        self._suffix = suffix
+        self._buffer = bytearray()
+        self._file = None
+        self._path: Optional[str] = None
+        self._digest = hashlib.sha256()
+
+    @classmethod
+    def from_path(cls, path: str) -> "SpooledUpload":
+        """
+        Take over a staged upload file, hashing it in UPLOAD_CHUNK_BYTES pieces (blocking I/O)
+
+        The file is removed when the returned upload is closed.
+        """
+        upload = cls(0, suffix=os.path.splitext(path)[1])
+        with open(path, "rb") as handle:
+            while chunk := handle.read(settings.UPLOAD_CHUNK_BYTES):
+                upload._digest.update(chunk)
+                upload.size += len(chunk)
+        upload._path = path
+        return upload
+
+    def move_to(self, path: str):
+        """Hand the content over to a file at path; this upload no longer owns a temp file afterwards"""
+        self.finish()
+        if self._path is not None:
+            shutil.move(self._path, path)
+            self._path = None
+        else:
+            with open(path, "wb") as handle:
+                handle.write(self._buffer)
+        self._buffer = bytearray()
+
+    def write(self, chunk: bytes):
+        self._digest.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and self._path is None and len(self._buffer) + len(chunk) > self._memory_limit:
+            self._file = tempfile.NamedTemporaryFile(suffix=self._suffix, delete=False)
+            self._path = self._file.name
+            self._file.write(self._buffer)
+            self._buffer = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._buffer += chunk
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    @property
+    def source(self) -> PdfSource:
+        """The bytes while the upload is in memory, otherwise the temp file path"""
+        return self._path if self._path is not None else bytes(self._buffer)
+
+    def read_bytes(self) -> bytes:
+        if self._path is None:
+            return bytes(self._buffer)
+        with open(self._path, "rb") as handle:
+            return handle.read()
+
+    def close(self):
+        self.finish()
+        if self._path is not None:
+            os.unlink(self._path)
+            self._path = None
+        self._buffer = bytearray()
+
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Copy an upload into a SpooledUpload
+
+    Raises:
+        UploadTooLargeError: If the upload is over max_bytes (UPLOAD_MAX_BYTES by default)
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"Upload is {file.size} bytes, the limit is {max_bytes}")
+
+    suffix = os.path.splitext(file.filename or "")[1]
+    upload = SpooledUpload(settings.UPLOAD_SPOOL_MEMORY_BYTES, suffix=suffix)
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_BYTES):
+            if upload.size + len(chunk) > max_bytes:
+                raise UploadTooLargeError(f"Upload is over the {max_bytes} byte limit")
+            upload.write(chunk)
+        upload.finish()
+    except BaseException:
+        upload.close()
+        raise
+    return upload
+
+
+def stage_upload(upload: SpooledUpload, name: str) -> str:
+    """Move an upload into SCAN_UPLOAD_DIR for a background scan; returns its path"""
+    directory = settings.SCAN_UPLOAD_DIR or os.path.join(tempfile.gettempdir(), "rushigo-scan-uploads")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name + upload._suffix)
+    upload.move_to(path)
+    return path
+
+
+def remove_staged_upload(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Failed to remove staged upload {path}: {e}")
@@ -0,0 +1,68 @@
+"""
+Background job worker
+
+Run as a separate process:
+
+    python -m services.worker --concurrency 4
+
+or in-process alongside the API when JOB_WORKER_IN_PROCESS is enabled.
+"""
+import argparse
+import logging
+import signal
+import threading
+from typing import Optional
+
+from core.config import settings
+from services.job_queue import JobWorker
+import services.job_handlers  # noqa: F401 (registers handlers)
+
+logger = logging.getLogger(__name__)
+
+_in_process_worker: Optional[JobWorker] = None
+
+
+def start_in_process_worker():
+    """Run job worker threads inside the API process"""
+    global _in_process_worker
+    if _in_process_worker is not None:
+        return
+    _in_process_worker = JobWorker()
+    _in_process_worker.start()
+
+
+def stop_in_process_worker():
+    global _in_process_worker
+    if _in_process_worker is None:
+        return
+    _in_process_worker.stop(timeout=30)
+    _in_process_worker = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RushiGo background job worker")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY,
+                        help="Number of jobs to run in parallel")
+    parser.add_argument("--poll-seconds", type=float, default=settings.JOB_POLL_SECONDS,
+                        help="How long to wait when the queue is empty")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    worker = JobWorker(concurrency=args.concurrency, poll_seconds=args.poll_seconds)
+    shutdown = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, finishing in-flight jobs")
+        shutdown.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    worker.start()
+    shutdown.wait()
+    worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.structured_extractor import parse_line, pre_extract, structured_fields
+
+TODAY = date(2025, 9, 1)
+
+
+@pytest.mark.parametrize("line", [
+    "Syllabus last updated: 2025-08-20",
+    "Classes begin Sept 3, 2025",
+    "Room 3.14.2025 capacity",
+])
+def test_dated_line_without_deadline_word_is_left_to_llm(line):
+    assert parse_line(line, TODAY) is None
+    result = pre_extract(line, TODAY)
+    assert result.deadlines == []
+    assert result.residual == [line]
+    assert not result.is_complete
+
+
+def test_ambiguous_numeric_date_is_left_to_llm():
+    result = pre_extract("Quiz due 3/4/2025", TODAY)
+    assert result.deadlines == []
+    assert result.residual == ["Quiz due 3/4/2025"]
+    assert not result.is_complete
+
+
+def test_demoted_csv_rows_go_to_residual_whole():
+    text = (
+        "Title,Due Date,Course\n"
+        "HW1,03/04/2026,CS101\n"
+        "HW2,03/11/2026,CS101\n"
+        "Project,03/25/2026,CS101\n"
+    )
+    result = pre_extract(text, TODAY)
+    assert [d["title"] for d in result.deadlines] == ["Project"]
+    assert result.residual == [
+        "Title: HW1, Due Date: 03/04/2026, Course: CS101",
+        "Title: HW2, Due Date: 03/11/2026, Course: CS101",
+    ]
+    assert result.unparsed_rows == 2
+    assert not result.is_complete
+
+
+def test_connectors_are_stripped_from_both_ends():
+    parsed = parse_line("Midterm exam on Oct 20 at 2pm", TODAY)
+    assert parsed["title"] == "Midterm exam"
+    assert parsed["date"] == datetime(2025, 10, 20, 14, 0)
+
+
+def test_confident_line_is_complete():
+    result = pre_extract("HW3 due 2025-10-15 23:59", TODAY)
+    assert [structured_fields(d) for d in result.deadlines] == [{
+        "title": "HW3",
+        "description": "HW3 due 2025-10-15 23:59",
+        "course": None,
+        "date": datetime(2025, 10, 15, 23, 59),
+        "priority": "medium",
+    }]
+    assert result.is_complete